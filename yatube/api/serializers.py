@@ -0,0 +1,120 @@
+"""Быстрая сериализация списков через values(), без экземпляров моделей."""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+# Публичное поле -> колонка в values()
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'excerpt': 'excerpt',
+    'html': 'text_html',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+}
+DEFAULT_LIST_FIELDS = ('id', 'excerpt', 'pub_date', 'author', 'group', 'image')
+
+
+class CursorError(ValueError):
+    pass
+
+
+def select_fields(request, available, default):
+    """Разбирает ?fields=a,b; неизвестные поля молча отбрасываются."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return [name for name in default if name in available]
+    names = [name.strip() for name in requested.split(',')]
+    return [name for name in names if name in available] or list(default)
+
+
+def encode_cursor(moment, pk):
+    raw = f'{moment.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        moment, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split(
+            '|'
+        )
+        return datetime.fromisoformat(moment), int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise CursorError(cursor)
+
+
+def _row(values, fields, mapping):
+    row = {name: values[mapping[name]] for name in fields}
+    if row.get('image') is not None:
+        row['image'] = (
+            settings.MEDIA_URL + row['image'] if row['image'] else None
+        )
+    return row
+
+
+def page_limit(request):
+    """?limit в пределах [1, API_MAX_PAGE_SIZE]; иначе CursorError."""
+    try:
+        limit = int(request.GET.get('limit') or settings.API_PAGE_SIZE)
+    except ValueError:
+        raise CursorError('limit')
+    if limit < 1:
+        raise CursorError('limit')
+    return min(limit, settings.API_MAX_PAGE_SIZE)
+
+
+def cursor_page(request, queryset, mapping, fields, date_field,
+                newest_first=True):
+    """Страница по ключу (дата, id): без OFFSET и без COUNT.
+
+    Возвращает словарь с результатами и курсором следующей страницы.
+    """
+    limit = page_limit(request)
+    cursor = request.GET.get('cursor')
+    before = '__lt' if newest_first else '__gt'
+    if cursor:
+        moment, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{date_field}{before}': moment})
+            | Q(**{date_field: moment, f'id{before}': pk})
+        )
+    order = '-' if newest_first else ''
+    columns = {mapping[name] for name in fields} | {'id', date_field}
+    rows = list(
+        queryset.order_by(f'{order}{date_field}', f'{order}id')
+        .values(*columns)[:limit + 1]
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][date_field], rows[-1]['id'])
+    return {
+        'results': [_row(row, fields, mapping) for row in rows],
+        'next': next_cursor,
+    }
+
+
+def post_detail(post, fields):
+    """Один пост (горячий или архивный) — здесь модель уже загружена."""
+    values = {
+        'id': post.id,
+        'text': post.text,
+        'excerpt': post.excerpt,
+        'text_html': post.text_html,
+        'pub_date': post.pub_date,
+        'author__username': post.author.username,
+        'group__slug': post.group.slug if post.group_id else None,
+        'image': post.image.name,
+    }
+    return _row(values, fields, POST_FIELDS)
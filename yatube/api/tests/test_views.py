@@ -0,0 +1,141 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='writer', first_name='Лев', last_name='Толстой'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Проза', slug='prose', description='Описание'
+        )
+        now = timezone.now()
+        cls.posts = []
+        for number in range(5):
+            post = Post.objects.create(
+                author=cls.author,
+                group=cls.group if number % 2 else None,
+                text=f'Пост {number}',
+            )
+            Post.objects.filter(id=post.id).update(
+                pub_date=now - timedelta(minutes=number)
+            )
+            cls.posts.append(post)
+        for number in range(3):
+            Comment.objects.create(
+                post=cls.posts[0], author=cls.reader, text=f'Коммент {number}'
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_cursor_pagination_walks_all_posts(self):
+        """Курсор выдаёт все посты по порядку без повторов."""
+        ids, cursor = [], ''
+        while True:
+            response = self.client.get(
+                reverse('api:index'), {'limit': 2, 'cursor': cursor}
+            )
+            data = response.json()
+            ids.extend(row['id'] for row in data['results'])
+            cursor = data['next']
+            if not cursor:
+                break
+        self.assertEqual(ids, [post.id for post in self.posts])
+
+    def test_bad_limit_is_rejected(self):
+        for limit in ('0', '-3', 'много'):
+            response = self.client.get(reverse('api:index'), {'limit': limit})
+            self.assertEqual(response.status_code, 400, limit)
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse('api:index'), {'fields': 'id,author,unknown', 'limit': 1}
+        )
+        self.assertEqual(
+            response.json()['results'],
+            [{'id': self.posts[0].id, 'author': 'writer'}]
+        )
+
+    def test_etag_gives_not_modified(self):
+        url = reverse('api:post_detail', args=(self.posts[0].id,))
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_group_profile_and_comments(self):
+        response = self.client.get(reverse('api:group_posts', args=('prose',)))
+        self.assertEqual(len(response.json()['results']), 2)
+        response = self.client.get(reverse('api:profile', args=('writer',)))
+        self.assertEqual(
+            response.json(),
+            {'username': 'writer', 'name': 'Лев Толстой', 'posts': 5,
+             'followers': 1, 'following': 0}
+        )
+        response = self.client.get(
+            reverse('api:post_comments', args=(self.posts[0].id,)),
+            {'fields': 'text'}
+        )
+        self.assertEqual(
+            [row['text'] for row in response.json()['results']],
+            ['Коммент 0', 'Коммент 1', 'Коммент 2']
+        )
+
+    def test_follow_feed_requires_login(self):
+        url = reverse('api:follow_posts')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.reader)
+        self.assertEqual(len(self.client.get(url).json()['results']), 5)
+
+    def test_errors_are_json(self):
+        response = self.client.get(reverse('api:post_detail', args=(999,)))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('api:index'), {'cursor': '!!'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch(self):
+        post_url = reverse('api:post_detail', args=(self.posts[1].id,))
+        response = self.client.post(
+            reverse('api:batch'),
+            json.dumps({'requests': [
+                post_url + '?fields=text',
+                reverse('api:profile', args=('writer',)),
+                '/about/author/',
+            ]}),
+            content_type='application/json',
+        )
+        responses = response.json()['responses']
+        self.assertEqual(responses[0]['body'], {'text': 'Пост 1'})
+        self.assertEqual(responses[1]['status'], 200)
+        self.assertEqual(responses[2]['status'], 404)
+
+    def test_batch_rejects_malformed_requests(self):
+        for body in (
+            {'requests': 5},
+            {'requests': 'abc'},
+            {'requests': [1]},
+            {'requests': None},
+            [],
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(
+                    reverse('api:batch'),
+                    json.dumps(body),
+                    content_type='application/json',
+                )
+                self.assertEqual(response.status_code, 400)
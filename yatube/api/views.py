@@ -0,0 +1,191 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotModified, QueryDict,
+)
+from django.shortcuts import get_object_or_404
+from django.urls import Resolver404, resolve
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from posts import graph
+from posts.models import ArchivedPost, Group, Post
+
+from . import serializers
+from .serializers import (
+    COMMENT_FIELDS, DEFAULT_LIST_FIELDS, POST_FIELDS, CursorError,
+    cursor_page, select_fields,
+)
+
+User = get_user_model()
+
+
+class NotAuthenticated(Exception):
+    pass
+
+
+def json_response(request, data, status=200):
+    """JSON с ETag по содержимому; совпавший If-None-Match даёт 304."""
+    body = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    etag = quote_etag(hashlib.md5(body.encode()).hexdigest())
+    if status == 200 and etag in parse_etags(
+        request.META.get('HTTP_IF_NONE_MATCH', '')
+    ):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            body, status=status, content_type='application/json'
+        )
+    response['ETag'] = etag
+    return response
+
+
+def error(request, status, message):
+    return json_response(request, {'error': message}, status=status)
+
+
+def api_view(view):
+    """GET-only JSON-представление с ответами об ошибках в JSON."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return json_response(request, view(request, *args, **kwargs))
+        except NotAuthenticated:
+            return error(request, 401, 'authentication required')
+        except Http404:
+            return error(request, 404, 'not found')
+        except (CursorError, ValueError):
+            return error(request, 400, 'bad cursor or limit')
+    return wrapper
+
+
+def post_list(request, queryset):
+    fields = select_fields(request, POST_FIELDS, DEFAULT_LIST_FIELDS)
+    return cursor_page(request, queryset, POST_FIELDS, fields, 'pub_date')
+
+
+@api_view
+def index(request):
+    return post_list(request, Post.objects.visible())
+
+
+@api_view
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return post_list(request, Post.objects.visible().filter(group=group))
+
+
+@api_view
+def profile(request, username):
+    author = get_object_or_404(User, username=username, is_active=True)
+    data = {
+        'username': author.username,
+        'name': author.get_full_name(),
+        'posts': author.posts.count(),
+        'followers': len(graph.followers(author.id)),
+        'following': len(graph.followings(author.id)),
+    }
+    if request.user.is_authenticated:
+        data['is_following'] = graph.is_following(request.user.id, author.id)
+    return data
+
+
+@api_view
+def profile_posts(request, username):
+    author = get_object_or_404(User, username=username, is_active=True)
+    return post_list(request, author.posts.all())
+
+
+@api_view
+def follow_posts(request):
+    if not request.user.is_authenticated:
+        raise NotAuthenticated
+    return post_list(
+        request,
+        Post.objects.visible().filter(author__following__user=request.user),
+    )
+
+
+@api_view
+def post_detail(request, post_id):
+    post = Post.objects.visible().select_related('author', 'group').filter(
+        id=post_id
+    ).first()
+    if post is None:
+        post = get_object_or_404(
+            ArchivedPost.objects.select_related('author', 'group'),
+            id=post_id,
+            author__is_active=True,
+        )
+    fields = select_fields(request, POST_FIELDS, POST_FIELDS)
+    return serializers.post_detail(post, fields)
+
+
+@api_view
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.visible(), id=post_id)
+    fields = select_fields(request, COMMENT_FIELDS, COMMENT_FIELDS)
+    return cursor_page(
+        request, post.comments.filter(author__is_active=True),
+        COMMENT_FIELDS, fields, 'created',
+        newest_first=False,
+    )
+
+
+@csrf_exempt
+@require_POST
+def batch(request):
+    """Несколько GET-запросов к API за один HTTP-запрос.
+
+    Тело: {"requests": ["/api/v1/posts/1/", "/api/v1/posts/?limit=5"]}.
+    Изменять данные через batch нельзя, поэтому CSRF не проверяется.
+    """
+    try:
+        paths = json.loads(request.body)['requests']
+    except (ValueError, KeyError, TypeError):
+        return error(request, 400, 'expected {"requests": [...]}')
+    if not isinstance(paths, list) or not all(
+        isinstance(path, str) for path in paths
+    ):
+        return error(request, 400, 'requests must be a list of paths')
+    if len(paths) > settings.API_MAX_BATCH:
+        return error(request, 400, 'too many requests')
+    responses = []
+    for full_path in paths:
+        path, _, query = full_path.partition('?')
+        try:
+            match = resolve(path)
+        except Resolver404:
+            match = None
+        if match is None or match.namespace != 'api' or match.func is batch:
+            responses.append({'path': full_path, 'status': 404})
+            continue
+        sub_request = _sub_request(request, path, query)
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        responses.append({
+            'path': full_path,
+            'status': response.status_code,
+            'body': json.loads(response.content),
+        })
+    return json_response(request, {'responses': responses})
+
+
+def _sub_request(request, path, query):
+    sub_request = request.__class__(request.environ)
+    sub_request.user = request.user
+    sub_request.method = 'GET'
+    sub_request.path = sub_request.path_info = path
+    sub_request.GET = QueryDict(query)
+    sub_request.META = {
+        key: value for key, value in request.META.items()
+        if key != 'HTTP_IF_NONE_MATCH'
+    }
+    sub_request.META.update(REQUEST_METHOD='GET', QUERY_STRING=query)
+    return sub_request
@@ -0,0 +1,24 @@
+from django.contrib import admin
+from .models import Job, OutboxEmail
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'status', 'priority', 'attempts', 'run_at', 'finished',
+    )
+    search_fields = ('name',)
+    list_filter = ('status', 'name')
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'subject', 'from_email', 'created', 'sent')
+    search_fields = ('subject', 'dedupe_key')
+    list_filter = ('sent',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -0,0 +1,118 @@
+"""Возобновляемые пакетные проходы по таблицам.
+
+Backfill обходит queryset чанками по первичному ключу (keyset, без OFFSET).
+Каждый чанк обрабатывается в своей транзакции вместе с записью контрольной
+точки, поэтому после падения проход продолжается со следующего чанка,
+а блокировка SQLite держится не дольше одного чанка. Между чанками
+делается пауза, чтобы не забирать базу у живых запросов.
+
+В миграции данных проход запускают так (миграция должна быть
+atomic = False, иначе все чанки окажутся в одной транзакции)::
+
+    def forwards(apps, schema_editor):
+        Backfill(
+            'posts.excerpt',
+            apps.get_model('posts', 'Post').objects.all(),
+            fill_excerpts,
+            checkpoints=apps.get_model('core', 'BackfillCheckpoint'),
+        ).run()
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+
+class Progress:
+    """Состояние прохода, которое получает колбэк progress."""
+    __slots__ = ('name', 'processed', 'total', 'last_pk', 'started')
+
+    def __init__(self, name, processed, total, last_pk):
+        self.name = name
+        self.processed = processed
+        self.total = total
+        self.last_pk = last_pk
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def __str__(self):
+        percent = 100 * self.processed / self.total if self.total else 100
+        return (
+            f'{self.name}: {self.processed}/{self.total} ({percent:.0f}%), '
+            f'id {self.last_pk}, {self.elapsed:.1f} с'
+        )
+
+
+class Backfill:
+    """Проход по queryset чанками с контрольными точками.
+
+    process получает список объектов чанка и делает с ними всё нужное,
+    например bulk_update. checkpoints — модель контрольных точек
+    (по умолчанию core.BackfillCheckpoint, в миграции — её историческая
+    версия).
+    """
+
+    def __init__(self, name, queryset, process, chunk_size=None,
+                 pause=None, checkpoints=None, progress=None):
+        if checkpoints is None:
+            from .models import BackfillCheckpoint
+            checkpoints = BackfillCheckpoint
+        self.name = name
+        self.queryset = queryset
+        self.process = process
+        self.chunk_size = chunk_size or settings.BACKFILL_CHUNK_SIZE
+        self.pause = settings.BACKFILL_PAUSE if pause is None else pause
+        self.checkpoints = checkpoints
+        self.progress = progress
+
+    def checkpoint(self):
+        checkpoint, _ = self.checkpoints.objects.get_or_create(name=self.name)
+        return checkpoint
+
+    def reset(self):
+        self.checkpoints.objects.filter(name=self.name).delete()
+
+    def _chunk(self, last_pk):
+        return list(
+            self.queryset.filter(pk__gt=last_pk)
+            .order_by('pk')[:self.chunk_size]
+        )
+
+    def run(self, max_chunks=None):
+        """Обрабатывает чанки до конца таблицы или max_chunks штук.
+
+        Возвращает число записей, обработанных этим запуском.
+        """
+        checkpoint = self.checkpoint()
+        state = Progress(
+            self.name,
+            checkpoint.processed,
+            checkpoint.processed
+            + self.queryset.filter(pk__gt=checkpoint.last_pk).count(),
+            checkpoint.last_pk,
+        )
+        processed = 0
+        chunks = 0
+        while max_chunks is None or chunks < max_chunks:
+            if chunks and self.pause:
+                time.sleep(self.pause)
+            with transaction.atomic():
+                objects = self._chunk(checkpoint.last_pk)
+                if objects:
+                    self.process(objects)
+                    checkpoint.last_pk = objects[-1].pk
+                    checkpoint.processed += len(objects)
+                checkpoint.finished = not objects
+                checkpoint.save()
+            if not objects:
+                break
+            chunks += 1
+            processed += len(objects)
+            state.processed = checkpoint.processed
+            state.last_pk = checkpoint.last_pk
+            if self.progress is not None:
+                self.progress(state)
+        return processed
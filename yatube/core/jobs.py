@@ -0,0 +1,156 @@
+"""Фоновая очередь задач в основной базе данных.
+
+Задача — функция, зарегистрированная декоратором @task в модуле tasks.py
+любого приложения. Обработчик запроса ставит её в очередь через enqueue()
+и сразу отвечает, а run_workers выполняет задачи в пуле потоков
+(и, при желании, процессов).
+
+Задачу забирает тот исполнитель, чей UPDATE ... WHERE status='queued'
+изменил строку, поэтому очередь работает и на SQLite без SELECT FOR UPDATE.
+Упавшая задача возвращается в очередь с экспоненциальной паузой,
+а после max_attempts попыток остаётся в статусе dead для разбора.
+Задачи исполнителей, переставших отвечать, каждый рабочий цикл раз в
+JOB_RELEASE_INTERVAL секунд возвращает в очередь или, если попытки
+кончились, отбрасывает.
+"""
+import json
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+registry = {}
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу под именем module.name."""
+    func.job_name = f'{func.__module__}.{func.__name__}'
+    registry[func.job_name] = func
+    return func
+
+
+def enqueue(func, priority=0, delay=None, run_at=None, max_attempts=None,
+            **kwargs):
+    """Ставит задачу в очередь; kwargs должны сериализоваться в JSON."""
+    if run_at is None:
+        run_at = timezone.now()
+        if delay is not None:
+            run_at += timedelta(seconds=delay)
+    return Job.objects.create(
+        name=func.job_name,
+        payload=json.dumps(kwargs, cls=DjangoJSONEncoder),
+        priority=priority,
+        run_at=run_at,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """Пауза перед следующей попыткой: база, удваиваемая с каждой неудачей."""
+    return timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def release_stale():
+    """Возвращает в очередь задачи исполнителей, переставших отвечать.
+
+    Попытка засчитана ещё при взятии задачи, поэтому задача, которая
+    каждый раз роняет исполнитель, после max_attempts попыток уходит в
+    dead. Возвращает число задач, вернувшихся в очередь.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT),
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.DEAD,
+        finished=now,
+        last_error='Исполнитель перестал отвечать',
+        locked_by='',
+        locked_at=None,
+    )
+    return stale.update(status=Job.QUEUED, locked_by='', locked_at=None)
+
+
+def claim(worker):
+    """Забирает самую приоритетную готовую задачу или возвращает None."""
+    while True:
+        now = timezone.now()
+        job = (
+            Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by('-priority', 'run_at', 'id')
+            .only('id')
+            .first()
+        )
+        if job is None:
+            return None
+        taken = Job.objects.filter(id=job.id, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if taken:
+            return Job.objects.get(id=job.id)
+        # Задачу перехватил другой исполнитель, берём следующую.
+
+
+def execute(job):
+    """Выполняет взятую задачу и записывает результат."""
+    now = timezone.now()
+    try:
+        func = registry[job.name]
+        func(**json.loads(job.payload))
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.DEAD
+            job.finished = now
+        else:
+            job.status = Job.QUEUED
+            job.run_at = now + backoff(job.attempts)
+    else:
+        job.status = Job.DONE
+        job.finished = now
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=[
+        'status', 'run_at', 'finished', 'last_error', 'locked_by',
+        'locked_at',
+    ])
+    return job.status
+
+
+def work(worker, stop=None, drain=False):
+    """Цикл исполнителя: брать и выполнять задачи, пока не попросят выйти.
+
+    stop — threading.Event; с drain=True цикл завершается, как только
+    готовых задач не осталось.
+    """
+    if stop is None:
+        stop = threading.Event()
+    done = 0
+    release_at = 0
+    while not stop.is_set():
+        close_old_connections()
+        if time.monotonic() >= release_at:
+            release_stale()
+            release_at = time.monotonic() + settings.JOB_RELEASE_INTERVAL
+        job = claim(worker)
+        if job is None:
+            if drain:
+                break
+            stop.wait(settings.JOB_POLL_INTERVAL)
+            continue
+        execute(job)
+        done += 1
+    close_old_connections()
+    return done
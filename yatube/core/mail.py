@@ -0,0 +1,187 @@
+"""Исходящая почта через очередь в базе данных.
+
+OutboxBackend подключается как EMAIL_BACKEND: send_mail и формы Django
+только кладут письма в core.OutboxEmail и ставят фоновую задачу.
+flush_outbox() отправляет накопленное пачками через одно соединение
+с настоящим бэкендом OUTBOX_EMAIL_BACKEND. Для файлового бэкенда это ещё
+и один файл на пачку вместо файла на письмо, а rotate_mail_files()
+сжимает вчерашние файлы в архив по дням и удаляет старые архивы.
+
+Повторные письма с одинаковым заголовком X-Outbox-Dedupe в пределах
+OUTBOX_DEDUPE_WINDOW секунд не ставятся в очередь.
+
+Пачку писем отправка сначала забирает себе одним UPDATE по неотправленным
+и никем не взятым строкам, как исполнитель забирает задачу в core.jobs:
+две одновременные отправки не пошлют одно письмо дважды. Пачка,
+взятая больше JOB_LOCK_TIMEOUT секунд назад, считается брошенной.
+"""
+import gzip
+import json
+import os
+import shutil
+import uuid
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import Job, OutboxEmail
+
+DEDUPE_HEADER = 'X-Outbox-Dedupe'
+
+
+def _row(message, now):
+    headers = dict(message.extra_headers)
+    key = headers.pop(DEDUPE_HEADER, '')
+    if key and OutboxEmail.objects.filter(
+        dedupe_key=key,
+        created__gte=now - timedelta(seconds=settings.OUTBOX_DEDUPE_WINDOW),
+    ).exists():
+        return None
+    envelope = {
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': headers,
+        'alternatives': list(getattr(message, 'alternatives', [])),
+    }
+    return OutboxEmail(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email,
+        envelope=json.dumps(envelope),
+        dedupe_key=key,
+    )
+
+
+def schedule_flush():
+    """Ставит отправку в очередь, если она ещё не ждёт исполнителя.
+
+    Идущая отправка не мешает поставить новую: письмо могло попасть в
+    очередь после её последней выборки, а повторно его не отправят —
+    строки забираются атомарно.
+    """
+    # tasks импортирует этот модуль, поэтому импорт отложен.
+    from .tasks import flush_outbox
+
+    if not Job.objects.filter(
+        name=flush_outbox.job_name, status=Job.QUEUED
+    ).exists():
+        enqueue(flush_outbox, priority=settings.OUTBOX_JOB_PRIORITY)
+
+
+class OutboxBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который только сохраняет письма в очередь."""
+
+    def send_messages(self, email_messages):
+        now = timezone.now()
+        rows = [
+            row for row in (_row(message, now) for message in email_messages)
+            if row is not None
+        ]
+        if rows:
+            OutboxEmail.objects.bulk_create(rows)
+            transaction.on_commit(schedule_flush)
+        return len(rows)
+
+
+def _message(row):
+    envelope = json.loads(row.envelope)
+    message = EmailMultiAlternatives(
+        row.subject,
+        row.body,
+        row.from_email,
+        envelope['to'],
+        bcc=envelope['bcc'],
+        cc=envelope['cc'],
+        reply_to=envelope['reply_to'],
+        headers=envelope['headers'],
+    )
+    for content, mimetype in envelope['alternatives']:
+        message.attach_alternative(content, mimetype)
+    return message
+
+
+def _claim(owner, batch_size):
+    """Забирает пачку свободных писем за owner и возвращает её."""
+    now = timezone.now()
+    free = OutboxEmail.objects.filter(sent__isnull=True).filter(
+        Q(locked_at__isnull=True)
+        | Q(locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT))
+    )
+    ids = list(
+        free.order_by('id').values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return None
+    # Строки, которые успела забрать другая отправка, UPDATE пропустит.
+    free.filter(id__in=ids).update(locked_by=owner, locked_at=now)
+    return list(
+        OutboxEmail.objects.filter(id__in=ids, locked_by=owner, sent=None)
+        .order_by('id')
+    )
+
+
+def flush_outbox(batch_size=None):
+    """Отправляет неотправленные письма пачками; возвращает их число."""
+    if batch_size is None:
+        batch_size = settings.OUTBOX_BATCH_SIZE
+    owner = uuid.uuid4().hex
+    sent = 0
+    with get_connection(settings.OUTBOX_EMAIL_BACKEND) as connection:
+        while True:
+            rows = _claim(owner, batch_size)
+            if rows is None:
+                return sent
+            ids = [row.id for row in rows]
+            try:
+                connection.send_messages([_message(row) for row in rows])
+            except Exception:
+                OutboxEmail.objects.filter(id__in=ids).update(
+                    locked_by='', locked_at=None
+                )
+                raise
+            OutboxEmail.objects.filter(id__in=ids).update(
+                sent=timezone.now(), locked_by='', locked_at=None
+            )
+            sent += len(rows)
+
+
+def rotate_mail_files(path=None, keep_days=None, today=None):
+    """Сжимает файлы писем за прошедшие дни в archive/<дата>.log.gz.
+
+    Архивы старше keep_days дней удаляются. Возвращает число сжатых файлов.
+    """
+    path = path or settings.EMAIL_FILE_PATH
+    if keep_days is None:
+        keep_days = settings.OUTBOX_FILE_KEEP_DAYS
+    today = today or date.today()
+    archive = os.path.join(path, 'archive')
+    if not os.path.isdir(path):
+        return 0
+    os.makedirs(archive, exist_ok=True)
+    compacted = 0
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if not name.endswith('.log') or not os.path.isfile(file_path):
+            continue
+        day = date.fromtimestamp(os.path.getmtime(file_path))
+        if day >= today:
+            continue
+        # gzip в режиме дозаписи добавляет новый член к тому же архиву.
+        target = os.path.join(archive, f'{day.isoformat()}.log.gz')
+        with open(file_path, 'rb') as source, gzip.open(target, 'ab') as gz:
+            shutil.copyfileobj(source, gz)
+        os.remove(file_path)
+        compacted += 1
+    oldest = today - timedelta(days=keep_days)
+    for name in os.listdir(archive):
+        if name[:10] < oldest.isoformat():
+            os.remove(os.path.join(archive, name))
+    return compacted
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = 'Измеряет время импорта WSGI-приложения и первого ответа'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/about/author/')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        timings = measure_startup(options['path'], options['runs'])
+        for name, seconds in timings.items():
+            self.stdout.write(f'{name}: {seconds * 1000:.1f} мс')
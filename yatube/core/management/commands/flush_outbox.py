@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.mail import flush_outbox, rotate_mail_files
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди и сжимает старые файлы писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Писем в одной пачке',
+        )
+        parser.add_argument(
+            '--rotate', action='store_true',
+            help='Сжать файлы файлового бэкенда за прошедшие дни',
+        )
+
+    def handle(self, *args, **options):
+        sent = flush_outbox(options['batch_size'])
+        self.stdout.write(f'Отправлено писем: {sent}')
+        if options['rotate']:
+            compacted = rotate_mail_files()
+            self.stdout.write(f'Сжато файлов: {compacted}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.startup import import_report
+
+
+class Command(BaseCommand):
+    help = 'Показывает самые медленные импорты при холодном старте'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='yatube.wsgi')
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument(
+            '--prefix', default='',
+            help='Показывать только модули с этим префиксом',
+        )
+
+    def handle(self, *args, **options):
+        rows = [
+            row for row in import_report(options['module'])
+            if row[0].startswith(options['prefix'])
+        ]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        self.stdout.write(f'{"общее, мс":>10} {"своё, мс":>10}  модуль')
+        for module, own, cumulative in rows[:options['top']]:
+            self.stdout.write(
+                f'{cumulative / 1000:>10.1f} {own / 1000:>10.1f}  {module}'
+            )
@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+
+from core.jobs import work
+
+
+def run_threads(threads, drain):
+    """Пул потоков одного процесса; возвращает число выполненных задач."""
+    stop = threading.Event()
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+    results = []
+
+    def target(number):
+        results.append(work(f'{prefix}:{number}', stop, drain))
+
+    pool = [
+        threading.Thread(target=target, args=(number,), daemon=True)
+        for number in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    try:
+        for thread in pool:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in pool:
+            thread.join()
+    return sum(results)
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи фоновой очереди в пуле потоков и процессов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Потоков-исполнителей в каждом процессе',
+        )
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Число процессов; больше одного — для задач на CPU',
+        )
+        parser.add_argument(
+            '--drain', action='store_true',
+            help='Выйти, когда готовых задач не останется',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        if options['processes'] == 1:
+            done = run_threads(options['threads'], options['drain'])
+            self.stdout.write(f'Выполнено задач: {done}')
+            return
+        # Дочерние процессы не должны делить соединения с родителем.
+        connections.close_all()
+        pool = [
+            multiprocessing.Process(
+                target=run_threads,
+                args=(options['threads'], options['drain']),
+            )
+            for _ in range(options['processes'])
+        ]
+        for process in pool:
+            process.start()
+        for process in pool:
+            process.join()
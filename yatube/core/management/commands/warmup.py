@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.warmup import warmup
+
+
+class Command(BaseCommand):
+    help = 'Компилирует шаблоны, строит URL-резолверы и прогревает кэши'
+
+    def handle(self, *args, **options):
+        for name, count in warmup().items():
+            self.stdout.write(f'{name}: {count}')
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Название')),
+                ('last_pk', models.BigIntegerField(default=0, verbose_name='Последний обработанный id')),
+                ('processed', models.BigIntegerField(default=0, verbose_name='Обработано записей')),
+                ('finished', models.BooleanField(default=False, verbose_name='Завершён')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка прохода',
+                'verbose_name_plural': 'Контрольные точки проходов',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято на отправку'),
+        ),
+        migrations.AddField(
+            model_name='outboxemail',
+            name='locked_by',
+            field=models.CharField(blank=True, max_length=32, verbose_name='Отправка, взявшая письмо'),
+        ),
+    ]
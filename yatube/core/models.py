@@ -11,3 +11,88 @@ class CreatedModel(models.Model):
     class Meta:
         # Это абстрактная модель:
         abstract = True
+
+
+class BackfillCheckpoint(models.Model):
+    """Позиция пакетного прохода core.batch.Backfill."""
+    name = models.CharField('Название', max_length=100, unique=True)
+    last_pk = models.BigIntegerField('Последний обработанный id', default=0)
+    processed = models.BigIntegerField('Обработано записей', default=0)
+    finished = models.BooleanField('Завершён', default=False)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка прохода'
+        verbose_name_plural = 'Контрольные точки проходов'
+
+    def __str__(self):
+        return self.name
+
+
+class Job(models.Model):
+    """Задача фоновой очереди core.jobs."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (DEAD, 'Отброшена'),
+    )
+    name = models.CharField('Задача', max_length=100)
+    payload = models.TextField('Аргументы (JSON)', default='{}')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=QUEUED
+    )
+    run_at = models.DateTimeField('Запустить не раньше')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Предел попыток')
+    locked_by = models.CharField('Исполнитель', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    finished = models.DateTimeField('Дата завершения', null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', '-priority', 'run_at'],
+                name='job_queue_idx',
+            ),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки фоновой задачей core.tasks.flush_outbox."""
+    subject = models.TextField('Тема')
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    envelope = models.TextField(
+        'Получатели, заголовки и вложенные версии (JSON)'
+    )
+    dedupe_key = models.CharField(
+        'Ключ дедупликации', max_length=300, blank=True, db_index=True
+    )
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    sent = models.DateTimeField('Дата отправки', null=True, blank=True)
+    locked_by = models.CharField(
+        'Отправка, взявшая письмо', max_length=32, blank=True
+    )
+    locked_at = models.DateTimeField(
+        'Взято на отправку', null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,67 @@
+"""Замеры холодного старта: время импортов и время до первого ответа."""
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+
+FIRST_RESPONSE_SCRIPT = '''
+import sys, time
+from wsgiref.util import setup_testing_defaults
+started = time.perf_counter()
+from yatube.wsgi import application
+imported = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+response = application(environ, lambda status, headers: None)
+b''.join(response)
+response.close()
+finished = time.perf_counter()
+print(imported - started, finished - imported)
+'''
+
+
+def _run_python(args):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(output):
+    """Разбирает вывод -X importtime в список (модуль, своё, общее) в мкс."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        if not own.strip().isdigit():
+            continue
+        rows.append((module.strip(), int(own), int(cumulative)))
+    return rows
+
+
+def import_report(module='yatube.wsgi'):
+    """Импортирует module в отдельном процессе с -X importtime."""
+    result = _run_python(['-X', 'importtime', '-c', f'import {module}'])
+    return parse_importtime(result.stderr)
+
+
+def measure_startup(path='/about/author/', runs=5):
+    """Время импорта WSGI-приложения и первого ответа, медиана по runs."""
+    imports, responses = [], []
+    for _ in range(runs):
+        result = _run_python(['-c', FIRST_RESPONSE_SCRIPT, path])
+        imported, responded = map(float, result.stdout.split())
+        imports.append(imported)
+        responses.append(responded)
+    return {
+        'import': statistics.median(imports),
+        'first_response': statistics.median(responses),
+    }
@@ -0,0 +1,14 @@
+"""Фоновые задачи ядра (выполняет manage.py run_workers)."""
+from django.conf import settings
+
+from .jobs import task
+from . import mail
+
+FILE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+
+@task
+def flush_outbox():
+    mail.flush_outbox()
+    if settings.OUTBOX_EMAIL_BACKEND == FILE_BACKEND:
+        mail.rotate_mail_files()
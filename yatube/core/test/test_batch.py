@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core.batch import Backfill
+from core.models import BackfillCheckpoint
+
+User = get_user_model()
+
+
+@override_settings(BACKFILL_CHUNK_SIZE=2, BACKFILL_PAUSE=0)
+class BackfillTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(5):
+            User.objects.create_user(username=f'user{index}')
+
+    def setUp(self):
+        self.seen = []
+
+    def collect(self, users):
+        self.seen.extend(user.username for user in users)
+
+    def test_runs_over_whole_table_in_chunks(self):
+        states = []
+        processed = Backfill(
+            'users', User.objects.all(), self.collect,
+            progress=lambda state: states.append(state.processed),
+        ).run()
+        self.assertEqual(processed, 5)
+        self.assertEqual(states, [2, 4, 5])
+        self.assertTrue(BackfillCheckpoint.objects.get(name='users').finished)
+
+    def test_resumes_after_failure(self):
+        def failing(users):
+            if len(self.seen) >= 2:
+                raise RuntimeError
+            self.collect(users)
+
+        with self.assertRaises(RuntimeError):
+            Backfill('users', User.objects.all(), failing).run()
+        self.assertEqual(
+            BackfillCheckpoint.objects.get(name='users').processed, 2
+        )
+        processed = Backfill('users', User.objects.all(), self.collect).run()
+        self.assertEqual(processed, 3)
+        self.assertEqual(len(set(self.seen)), 5)
+
+    def test_max_chunks_and_reset(self):
+        backfill = Backfill('users', User.objects.all(), self.collect)
+        self.assertEqual(backfill.run(max_chunks=1), 2)
+        backfill.reset()
+        self.assertEqual(backfill.run(), 5)
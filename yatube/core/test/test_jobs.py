@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+calls = []
+
+
+@jobs.task
+def record(value):
+    calls.append(value)
+
+
+@jobs.task
+def fail():
+    raise RuntimeError('Сбой')
+
+
+@override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY=60)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_by_priority(self):
+        jobs.enqueue(record, value='low')
+        jobs.enqueue(record, priority=5, value='high')
+        self.assertEqual(jobs.work('test', drain=True), 2)
+        self.assertEqual(calls, ['high', 'low'])
+        self.assertEqual(
+            Job.objects.filter(status=Job.DONE).count(), 2
+        )
+
+    def test_scheduled_job_waits_for_its_time(self):
+        job = jobs.enqueue(record, delay=60, value='later')
+        self.assertEqual(jobs.work('test', drain=True), 0)
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        self.assertEqual(jobs.work('test', drain=True), 1)
+        self.assertEqual(calls, ['later'])
+
+    def test_failed_job_is_retried_with_backoff_then_dead(self):
+        job = jobs.enqueue(fail)
+        before = timezone.now()
+        jobs.work('test', drain=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=60))
+        self.assertIn('RuntimeError', job.last_error)
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        jobs.work('test', drain=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DEAD)
+        self.assertEqual(job.attempts, 2)
+
+    def test_claimed_job_is_not_taken_twice(self):
+        jobs.enqueue(record, value='once')
+        self.assertIsNotNone(jobs.claim('first'))
+        self.assertIsNone(jobs.claim('second'))
+
+    def test_stale_running_job_returns_to_queue(self):
+        job = jobs.enqueue(record, value='stale')
+        jobs.claim('gone')
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(jobs.release_stale(), 1)
+        self.assertEqual(jobs.work('test', drain=True), 1)
+
+    def test_worker_releases_stale_jobs(self):
+        job = jobs.enqueue(record, value='stale')
+        jobs.claim('gone')
+        Job.objects.filter(id=job.id).update(
+            locked_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(jobs.work('test', drain=True), 1)
+        self.assertEqual(calls, ['stale'])
+
+    def test_stale_job_out_of_attempts_is_dead(self):
+        job = jobs.enqueue(record, value='crash')
+        Job.objects.filter(id=job.id).update(
+            status=Job.RUNNING,
+            attempts=2,
+            locked_by='gone',
+            locked_at=timezone.now() - timedelta(days=1),
+        )
+        self.assertEqual(jobs.release_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DEAD)
+        self.assertEqual(jobs.work('test', drain=True), 0)
+
+
+class RunWorkersTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_run_workers_command_drains_queue(self):
+        jobs.enqueue(record, value='command')
+        out = StringIO()
+        call_command('run_workers', '--threads=1', '--drain', stdout=out)
+        self.assertIn('Выполнено задач: 1', out.getvalue())
+        self.assertEqual(calls, ['command'])
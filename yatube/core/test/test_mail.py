@@ -0,0 +1,115 @@
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.mail import flush_outbox, rotate_mail_files, schedule_flush
+from core.models import Job, OutboxEmail
+
+User = get_user_model()
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxBackend',
+    OUTBOX_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class OutboxTests(TestCase):
+    def test_send_mail_only_queues_message(self):
+        mail.send_mail('Тема', 'Текст', 'from@yatube.ru', ['to@yatube.ru'])
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_flush_sends_all_in_batches(self):
+        for number in range(5):
+            mail.send_mail(
+                f'Тема {number}', 'Текст', 'from@yatube.ru', ['to@yatube.ru']
+            )
+        self.assertEqual(flush_outbox(batch_size=2), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutboxEmail.objects.filter(sent__isnull=True))
+        self.assertEqual(flush_outbox(), 0)
+
+    def test_password_reset_is_deduplicated_within_window(self):
+        User.objects.create_user(
+            username='forgetful', email='me@yatube.ru', password='pass-1234'
+        )
+        client = Client()
+        for _ in range(3):
+            client.post(
+                reverse('users:password_reset'), {'email': 'me@yatube.ru'}
+            )
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+        flush_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertNotIn('X-Outbox-Dedupe', mail.outbox[0].extra_headers)
+
+    def test_flush_skips_rows_claimed_by_another_flush(self):
+        for number in range(3):
+            mail.send_mail(
+                f'Тема {number}', 'Текст', 'from@yatube.ru', ['to@yatube.ru']
+            )
+        first, second, third = OutboxEmail.objects.order_by('id')
+        OutboxEmail.objects.filter(id=first.id).update(
+            locked_by='other', locked_at=timezone.now()
+        )
+        OutboxEmail.objects.filter(id=second.id).update(
+            locked_by='gone', locked_at=timezone.now() - timedelta(days=1)
+        )
+        self.assertEqual(flush_outbox(), 2)
+        self.assertEqual(
+            sorted(message.subject for message in mail.outbox),
+            ['Тема 1', 'Тема 2'],
+        )
+        self.assertIsNone(OutboxEmail.objects.get(id=first.id).sent)
+
+    def test_failed_batch_is_released(self):
+        mail.send_mail('Тема', 'Текст', 'from@yatube.ru', ['to@yatube.ru'])
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=OSError,
+        ):
+            with self.assertRaises(OSError):
+                flush_outbox()
+        self.assertEqual(flush_outbox(), 1)
+
+    def test_flush_job_is_scheduled_once(self):
+        schedule_flush()
+        schedule_flush()
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class RotateMailFilesTests(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_old_files_are_compacted_by_day(self):
+        today = date(2024, 5, 10)
+        yesterday = today - timedelta(days=1)
+        stamp = os.path.getmtime(self.path)
+        for name, day in (('a.log', yesterday), ('b.log', yesterday),
+                          ('c.log', today)):
+            file_path = os.path.join(self.path, name)
+            with open(file_path, 'w') as file:
+                file.write(name)
+            timestamp = stamp + (day - date.fromtimestamp(stamp)).days * 86400
+            os.utime(file_path, (timestamp, timestamp))
+        self.assertEqual(rotate_mail_files(self.path, 14, today), 2)
+        self.assertEqual(
+            sorted(os.listdir(self.path)), ['archive', 'c.log']
+        )
+        archive = os.path.join(
+            self.path, 'archive', f'{yesterday.isoformat()}.log.gz'
+        )
+        with gzip.open(archive, 'rt') as file:
+            self.assertEqual(file.read(), 'a.logb.log')
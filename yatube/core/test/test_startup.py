@@ -0,0 +1,22 @@
+from django.test import SimpleTestCase
+
+from core.startup import import_report, parse_importtime
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        340 |   django.urls\n'
+            'import time:      1500 |       2000 | yatube.wsgi\n'
+        )
+        self.assertEqual(
+            parse_importtime(output),
+            [('django.urls', 120, 340), ('yatube.wsgi', 1500, 2000)]
+        )
+
+    def test_wsgi_import_does_not_load_pillow(self):
+        """Pillow нужен только при работе с картинками, не при старте."""
+        modules = {module for module, _, _ in import_report('yatube.wsgi')}
+        self.assertIn('yatube.wsgi', modules)
+        self.assertFalse({'PIL', 'PIL.Image'} & modules)
@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from core.warmup import compile_templates
+
+CACHED_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'DIRS': engines['django'].engine.dirs,
+    'OPTIONS': {
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+
+class WarmupTests(TestCase):
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_templates_are_kept_by_cached_loader(self):
+        """После прогрева шаблоны лежат в кэше загрузчика."""
+        compiled, _ = compile_templates()
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertGreater(compiled, 0)
+        self.assertIn('includes/post_card.html', loader.get_template_cache)
+        self.assertIn('base.html', loader.get_template_cache)
+
+    def test_warmup_command_reports_steps(self):
+        out = StringIO()
+        call_command('warmup', stdout=out)
+        report = out.getvalue()
+        for step in ('templates', 'url_namespaces: 3', 'cards: 0'):
+            self.assertIn(step, report)
@@ -0,0 +1,73 @@
+"""Прогрев процесса перед форком воркеров gunicorn."""
+import os
+
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+URL_NAMESPACES = ('posts', 'users', 'about')
+
+
+def template_names(engine):
+    dirs = [*engine.engine.dirs, *get_app_template_dirs('templates')]
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith('.html'):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, directory)
+
+
+def compile_templates():
+    """Разбирает все шаблоны; кэширующий загрузчик сохранит результат.
+
+    Возвращает число разобранных шаблонов и имена шаблонов с ошибками.
+    """
+    compiled = 0
+    broken = []
+    for engine in engines.all():
+        for name in sorted(set(template_names(engine))):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError:
+                broken.append(name)
+            else:
+                compiled += 1
+    return compiled, broken
+
+
+def build_resolvers():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for namespace in URL_NAMESPACES:
+        _, sub_resolver = resolver.namespace_dict[namespace]
+        sub_resolver.reverse_dict
+    return len(URL_NAMESPACES)
+
+
+def prime_caches():
+    """Заполняет кэш карточек первой страницы главной ленты."""
+    from posts.cards import render_card
+    from posts.models import Post
+    from posts.queries import feed_queryset
+    from posts.views import posts_on_page
+
+    versions = {}
+    posts = feed_queryset(Post.objects.all())[:posts_on_page]
+    for post in posts:
+        render_card(post, versions)
+    return len(posts)
+
+
+def warmup():
+    compiled, broken = compile_templates()
+    report = {
+        'templates': compiled,
+        'broken_templates': ', '.join(broken) or '-',
+        'url_namespaces': build_resolvers(),
+        'cards': prime_caches(),
+    }
+    # Соединения с БД нельзя наследовать форкнутым воркерам.
+    connections.close_all()
+    return report
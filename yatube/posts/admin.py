@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Post, Group, Comment, Follow
+from .models import ArchivedPost, Post, Group, Comment, Follow
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -29,7 +29,15 @@ class FollowAdmin(admin.ModelAdmin):
     search_fields = ('author',)
 
 
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'archived')
+    search_fields = ('text',)
+    list_filter = ('pub_date',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(ArchivedPost, ArchivedPostAdmin)
@@ -0,0 +1,161 @@
+"""Перенос старых постов в архивные таблицы и обратно."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import reactions, tags
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_FIELDS = (
+    'id', 'text', 'excerpt', 'text_html', 'pub_date', 'author_id',
+    'group_id', 'image', 'views',
+)
+COMMENT_FIELDS = (
+    'id', 'post_id', 'author_id', 'text', 'created', 'parent_id', 'path',
+    'depth',
+)
+
+
+def archive_cutoff(days=None):
+    """Дата, старше которой посты считаются холодными."""
+    if days is None:
+        days = settings.POSTS_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def _copy(instance, model, fields):
+    return model(**{name: getattr(instance, name) for name in fields})
+
+
+@transaction.atomic
+def _archive_batch(post_ids):
+    posts = Post.objects.filter(id__in=post_ids)
+    comments = Comment.objects.filter(post_id__in=post_ids)
+    ArchivedPost.objects.bulk_create(
+        _copy(post, ArchivedPost, POST_FIELDS) for post in posts
+    )
+    ArchivedComment.objects.bulk_create(
+        _copy(comment, ArchivedComment, COMMENT_FIELDS)
+        for comment in comments
+    )
+    # Реакции на комментарии уходят каскадом; счётчики постов остаются
+    # и показывают замороженные итоги на архивных карточках.
+    reactions.drop_counters(
+        'comment', comments.values_list('id', flat=True)
+    )
+    comments.delete()
+    posts.delete()
+
+
+def archive_posts(cutoff=None, batch_size=None):
+    """Переносит посты старше cutoff вместе с комментариями в архив.
+
+    Работает пачками, каждая пачка — отдельная транзакция.
+    Возвращает количество перенесённых постов.
+    """
+    if cutoff is None:
+        cutoff = archive_cutoff()
+    if batch_size is None:
+        batch_size = settings.POSTS_ARCHIVE_BATCH_SIZE
+    moved = 0
+    while True:
+        post_ids = list(
+            Post.objects.filter(pub_date__lt=cutoff)
+            .order_by('pub_date')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not post_ids:
+            return moved
+        _archive_batch(post_ids)
+        moved += len(post_ids)
+
+
+def bulk_restore(model, instances, date_fields, **options):
+    """bulk_create, сохраняющий переданные даты в полях date_fields.
+
+    С ignore_conflicts=True даты правятся только у вставленных строк:
+    уже существующие записи с теми же id остаются нетронутыми.
+    """
+    if options.get('ignore_conflicts'):
+        existing = set(
+            model.objects.filter(
+                pk__in=[instance.pk for instance in instances]
+            ).values_list('pk', flat=True)
+        )
+    else:
+        existing = set()
+    # auto_now_add перезаписывает даты при вставке, возвращаем исходные.
+    dates = [
+        [getattr(instance, name) for name in date_fields]
+        for instance in instances
+    ]
+    model.objects.bulk_create(instances, **options)
+    inserted = []
+    for instance, values in zip(instances, dates):
+        if instance.pk in existing:
+            continue
+        for name, value in zip(date_fields, values):
+            setattr(instance, name, value)
+        inserted.append(instance)
+    model.objects.bulk_update(inserted, date_fields)
+
+
+@transaction.atomic
+def restore_posts(post_ids):
+    """Возвращает архивные посты с комментариями в основные таблицы."""
+    archived = ArchivedPost.objects.filter(id__in=post_ids)
+    comments = ArchivedComment.objects.filter(post_id__in=post_ids)
+    posts = [_copy(post, Post, POST_FIELDS) for post in archived]
+    bulk_restore(Post, posts, ['pub_date'])
+    # bulk_create минует Post.save, теги и упоминания собираем сами.
+    tags.index_posts(posts, fresh=True)
+    bulk_restore(
+        Comment,
+        [_copy(comment, Comment, COMMENT_FIELDS) for comment in comments],
+        ['created'],
+    )
+    # Реакции удалены при архивации, старые итоги им больше не
+    # соответствуют.
+    reactions.drop_counters('post', post_ids)
+    comments.delete()
+    archived.delete()
+    return len(posts)
+
+
+class HotColdPosts:
+    """Последовательность для Paginator: сначала горячие посты, затем архив.
+
+    Архивные посты всегда старше горячих, поэтому порядок по дате
+    сохраняется без сортировки объединения.
+    """
+
+    def __init__(self, hot, cold):
+        self.hot = hot
+        self.cold = cold
+        self._hot_count = None
+
+    @property
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count + self.cold.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = index.stop
+        items = list(self.hot[start:stop])
+        if stop is None or stop > self.hot_count:
+            cold_start = max(start - self.hot_count, 0)
+            cold_stop = None if stop is None else stop - self.hot_count
+            items.extend(self.cold[cold_start:cold_stop])
+        return items
@@ -0,0 +1,53 @@
+"""Кэш отрисованных карточек постов с версионированными ключами.
+
+Версия автора — отпечаток полей, которые карточка выводит. Они уже
+загружены вместе с постом, так что версия не хранится в кэше и не
+расходится между процессами: новое имя автора сразу даёт новые ключи.
+"""
+import hashlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+CARD_TEMPLATE = 'includes/post_card.html'
+stats = Counter()
+
+
+def author_version(author):
+    """Отпечаток имени автора, которое рисует карточка."""
+    name = '\n'.join(
+        (author.username, author.first_name, author.last_name)
+    )
+    return hashlib.md5(name.encode()).hexdigest()[:12]
+
+
+def card_key(post, version):
+    return (
+        f'post_card:{post._meta.model_name}:{post.id}:'
+        f'{post.updated_at.timestamp()}:{version}'
+    )
+
+
+def render_card(post, versions):
+    """Возвращает HTML карточки из кэша или рисует и кладёт его туда.
+
+    versions — словарь версий авторов, общий для одной отрисовки страницы.
+    """
+    if post.author_id not in versions:
+        versions[post.author_id] = author_version(post.author)
+    key = card_key(post, versions[post.author_id])
+    html = cache.get(key)
+    if html is not None:
+        stats['hits'] += 1
+        return html
+    stats['misses'] += 1
+    html = render_to_string(CARD_TEMPLATE, {'post': post})
+    cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def hit_rate():
+    total = stats['hits'] + stats['misses']
+    return stats['hits'] / total if total else 0.0
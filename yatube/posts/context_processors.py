@@ -0,0 +1,9 @@
+from . import notifications as inbox
+
+
+def notifications(request):
+    """Число непрочитанных уведомлений для значка в шапке."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'notifications_unread': inbox.unread_count(user)}
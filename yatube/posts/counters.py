@@ -0,0 +1,75 @@
+"""Счётчики просмотров постов с буфером в памяти процесса.
+
+Просмотр — только инкремент словаря под замком. Раз в VIEW_FLUSH_INTERVAL
+секунд или после VIEW_FLUSH_THRESHOLD просмотров буфер уходит в БД
+пачками вида
+
+    UPDATE posts_post SET views = views + CASE id WHEN 1 THEN 3 ... END
+    WHERE id IN (1, ...)
+
+Каждый процесс сбрасывает свой буфер сам; прибавление к текущему значению
+делает сброс безопасным при нескольких процессах. При штатной остановке
+воркера gunicorn остаток сбрасывает хук worker_exit; при падении процесса
+несброшенные просмотры теряются — для счётчика это допустимо.
+"""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Post
+
+
+class ViewBuffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.total = 0
+        self.flushed_at = time.monotonic()
+
+    def record(self, post_id):
+        """Засчитывает просмотр; при необходимости сбрасывает буфер."""
+        with self.lock:
+            self.pending[post_id] += 1
+            self.total += 1
+            due = (
+                self.total >= settings.VIEW_FLUSH_THRESHOLD
+                or time.monotonic() - self.flushed_at
+                >= settings.VIEW_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def take(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.total = 0
+            self.flushed_at = time.monotonic()
+        return pending
+
+    def flush(self):
+        """Пишет накопленное в БД; возвращает число обновлённых постов."""
+        pending = self.take()
+        items = sorted(pending.items())
+        size = settings.VIEW_FLUSH_BATCH_SIZE
+        for start in range(0, len(items), size):
+            batch = items[start:start + size]
+            increments = Case(
+                *(When(id=post_id, then=Value(count))
+                  for post_id, count in batch),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            Post.objects.filter(
+                id__in=[post_id for post_id, _ in batch]
+            ).update(views=F('views') + increments)
+        return len(items)
+
+
+buffer = ViewBuffer()
+
+
+def record_view(post_id):
+    buffer.record(post_id)
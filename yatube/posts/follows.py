@@ -0,0 +1,36 @@
+"""Подписки: одна запись в БД на действие, без проверок перед записью."""
+from django.db import IntegrityError, transaction
+
+from . import graph
+from .models import Follow
+
+
+def follow(user, author):
+    """Подписывает user на author одним INSERT.
+
+    Повторная подписка упирается в unique_following и не считается ошибкой.
+    Возвращает True, если подписка создана этим вызовом.
+    """
+    if user == author:
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        return False
+    return True
+
+
+def unfollow(user, author):
+    """Отписывает одним DELETE; возвращает True, если подписка была."""
+    deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+    if deleted:
+        graph.forget([(user.id, author.id)])
+    return bool(deleted)
+
+
+def follow_state(user, author, following):
+    return {
+        'following': following,
+        'followers': len(graph.followers(author.id)),
+    }
@@ -0,0 +1,96 @@
+"""Граф подписок в кэше: отсортированные массивы id для каждого пользователя.
+
+На ребро уходит 4 байта в каждом из двух массивов. Массивы грузятся из БД
+при первом обращении; подписка и отписка не правят их на месте, а
+удаляют, и следующее чтение загружает массив заново.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+FOLLOWINGS = 'following'
+FOLLOWERS = 'followers'
+
+
+def _key(kind, user_id):
+    return f'follow_graph:{kind}:{user_id}'
+
+
+def _load(kind, user_id):
+    from .models import Follow
+
+    if kind == FOLLOWINGS:
+        ids = Follow.objects.filter(user_id=user_id).values_list(
+            'author_id', flat=True
+        )
+    else:
+        ids = Follow.objects.filter(author_id=user_id).values_list(
+            'user_id', flat=True
+        )
+    return array('I', sorted(ids))
+
+
+def _get(kind, user_id):
+    data = cache.get(_key(kind, user_id))
+    if data is not None:
+        ids = array('I')
+        ids.frombytes(data)
+        return ids
+    ids = _load(kind, user_id)
+    _set(kind, user_id, ids)
+    return ids
+
+
+def _set(kind, user_id, ids):
+    cache.set(
+        _key(kind, user_id), ids.tobytes(), settings.FOLLOW_GRAPH_TIMEOUT
+    )
+
+
+def _contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def followings(user_id):
+    """Отсортированный массив id авторов, на которых подписан user_id."""
+    return _get(FOLLOWINGS, user_id)
+
+
+def followers(user_id):
+    """Отсортированный массив id читателей user_id."""
+    return _get(FOLLOWERS, user_id)
+
+
+def is_following(user_id, author_id):
+    return _contains(followings(user_id), author_id)
+
+
+def mutual_follows(user_id):
+    """Id пользователей, с которыми user_id подписан взаимно."""
+    readers = followers(user_id)
+    return [
+        author_id for author_id in followings(user_id)
+        if _contains(readers, author_id)
+    ]
+
+
+def forget(edges):
+    """Сбрасывает массивы обоих концов рёбер (user_id, author_id).
+
+    Ключи удаляются сразу и ещё раз после коммита: массив, который
+    другой запрос успел перечитать из БД до коммита, иначе остался бы
+    в кэше без изменения до истечения FOLLOW_GRAPH_TIMEOUT.
+    """
+    keys = set()
+    for user_id, author_id in edges:
+        keys.add(_key(FOLLOWINGS, user_id))
+        keys.add(_key(FOLLOWERS, author_id))
+    if not keys:
+        return
+    keys = list(keys)
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,54 @@
+"""Ожидание новых постов для long-poll и Server-Sent Events.
+
+Ждущий запрос спит на условной переменной процесса и просыпается, когда
+в этом процессе создан пост. Посты из других процессов замечаются
+проверкой MAX(pub_date) по индексу раз в LIVE_POLL_INTERVAL секунд.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max
+
+
+class Notifier:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.version != version, timeout
+            )
+
+
+notifier = Notifier()
+
+
+def latest_date(posts):
+    return posts.aggregate(latest=Max('pub_date'))['latest']
+
+
+def wait_for_new(posts, since, timeout):
+    """Возвращает дату самого нового поста, дождавшись поста новее since.
+
+    Если за timeout секунд новых постов нет, возвращает текущую дату
+    самого нового поста (не новее since).
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        # Версию читаем до запроса, чтобы не пропустить уведомление.
+        version = notifier.version
+        latest = latest_date(posts)
+        if latest is not None and (since is None or latest > since):
+            return latest
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return latest
+        notifier.wait(version, min(remaining, settings.LIVE_POLL_INTERVAL))
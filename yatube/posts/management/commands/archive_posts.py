@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_cutoff, archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты и их комментарии в архивные таблицы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Возраст поста в днях, после которого он уходит в архив',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Количество постов в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        moved = archive_posts(
+            cutoff=archive_cutoff(options['days']),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(f'Перенесено в архив постов: {moved}')
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from core.batch import Backfill
+from posts import threads
+from posts.models import ArchivedComment, Comment
+
+
+def set_paths(comments):
+    # Пути нет только у комментариев, вставленных в обход save
+    # (bulk_create); считаем их корневыми.
+    for comment in comments:
+        comment.path = threads.segment(comment.id)
+        comment.depth = 0
+    type(comments[0]).objects.bulk_update(comments, ['path', 'depth'])
+
+
+class Command(BaseCommand):
+    help = 'Заполняет путь ветки у комментариев без пути'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Количество комментариев в одной транзакции',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=None,
+            help='Пауза между пачками в секундах',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать с начала, забыв контрольные точки',
+        )
+
+    def handle(self, *args, **options):
+        updated = 0
+        for name, model in (
+            ('posts.comment_paths', Comment),
+            ('posts.archived_comment_paths', ArchivedComment),
+        ):
+            backfill = Backfill(
+                name,
+                model.objects.filter(path='').only('id'),
+                set_paths,
+                chunk_size=options['batch_size'],
+                pause=options['pause'],
+                progress=lambda state: self.stdout.write(str(state)),
+            )
+            if options['restart']:
+                backfill.reset()
+            updated += backfill.run()
+        self.stdout.write(f'Обновлено комментариев: {updated}')
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.batch import Backfill
+from posts import tags
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Собирает хэштеги и упоминания существующих постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Количество постов в одной транзакции',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=None,
+            help='Пауза между пачками в секундах',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать с начала, забыв контрольную точку',
+        )
+
+    def handle(self, *args, **options):
+        backfill = Backfill(
+            'posts.post_tags',
+            Post.objects.only('id', 'text', 'pub_date', 'author_id'),
+            tags.index_posts,
+            chunk_size=options['batch_size'],
+            pause=options['pause'],
+            progress=lambda state: self.stdout.write(str(state)),
+        )
+        if options['restart']:
+            backfill.reset()
+        updated = backfill.run()
+        self.stdout.write(f'Обработано постов: {updated}')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.batch import Backfill
+from posts.models import Post
+
+
+def render_posts(posts):
+    for post in posts:
+        post.render_text()
+    Post.objects.bulk_update(posts, ['excerpt', 'text_html'])
+
+
+class Command(BaseCommand):
+    help = 'Заполняет выдержку и HTML у существующих постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Количество постов в одной транзакции',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=None,
+            help='Пауза между пачками в секундах',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать с начала, забыв контрольную точку',
+        )
+
+    def handle(self, *args, **options):
+        backfill = Backfill(
+            'posts.post_text',
+            Post.objects.only('id', 'text'),
+            render_posts,
+            chunk_size=options['batch_size'],
+            pause=options['pause'],
+            progress=lambda state: self.stdout.write(str(state)),
+        )
+        if options['restart']:
+            backfill.reset()
+        updated = backfill.run()
+        self.stdout.write(f'Обновлено постов: {updated}')
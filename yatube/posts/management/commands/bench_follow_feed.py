@@ -0,0 +1,91 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.utils import timezone
+
+from posts.merge_feed import MergeFeed
+from posts.models import Follow, Post
+from posts.queries import feed_queryset
+from posts.views import posts_on_page
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ленту подписок через JOIN и слиянием потоков авторов. '
+        'Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--authors', type=int, nargs='+', default=[10, 1000, 10000]
+        )
+        parser.add_argument('--posts-per-author', type=int, default=3)
+        parser.add_argument('--pages', type=int, default=3)
+
+    def handle(self, *args, **options):
+        for authors in options['authors']:
+            with transaction.atomic():
+                reader = self.populate(authors, options['posts_per_author'])
+                join = self.time_join(reader, options['pages'])
+                merge = self.time_merge(reader, options['pages'])
+                transaction.set_rollback(True)
+            self.stdout.write(
+                f'авторов {authors}: JOIN {join * 1000:.1f} мс, '
+                f'слияние {merge * 1000:.1f} мс '
+                f'на {options["pages"]} стр.'
+            )
+
+    def populate(self, authors, posts_per_author):
+        prefix = f'bench-{time.monotonic_ns()}'
+        reader = User.objects.create_user(username=f'{prefix}-reader')
+        User.objects.bulk_create(
+            User(username=f'{prefix}-{number}') for number in range(authors)
+        )
+        author_ids = list(
+            User.objects.filter(username__startswith=f'{prefix}-')
+            .exclude(id=reader.id).values_list('id', flat=True)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=reader, author_id=author_id)
+            for author_id in author_ids
+        )
+        now = timezone.now()
+        posts = [
+            Post(author_id=author_id, text='Пост для замера')
+            for author_id in author_ids
+            for _ in range(posts_per_author)
+        ]
+        Post.objects.bulk_create(posts, batch_size=500)
+        # auto_now_add ставит всем одну дату, разносим посты по времени.
+        created = list(
+            Post.objects.filter(author__following__user=reader).only('id')
+        )
+        for number, post in enumerate(created):
+            post.pub_date = now - timedelta(minutes=(number * 7919) % 100003)
+        Post.objects.bulk_update(created, ['pub_date'], batch_size=500)
+        cache.clear()
+        return reader
+
+    def time_join(self, reader, pages):
+        posts = feed_queryset(
+            Post.objects.filter(author__following__user=reader)
+        )
+        paginator = Paginator(posts, posts_on_page)
+        started = time.perf_counter()
+        for number in range(1, pages + 1):
+            list(paginator.get_page(number))
+        return time.perf_counter() - started
+
+    def time_merge(self, reader, pages):
+        started = time.perf_counter()
+        paginator = Paginator(MergeFeed(reader), posts_on_page)
+        for number in range(1, pages + 1):
+            list(paginator.get_page(number))
+        return time.perf_counter() - started
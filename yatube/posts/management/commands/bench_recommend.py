@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.recommend import FollowMatrix
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет расчёт предложений подписок на случайном графе '
+        'без обращений к БД'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--edges', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--top-k', type=int, default=None)
+
+    def handle(self, *args, **options):
+        batch_size = (
+            options['batch_size'] or settings.FOLLOW_SUGGESTIONS_BATCH_SIZE
+        )
+        top_k = options['top_k'] or settings.FOLLOW_SUGGESTIONS_TOP_K
+        rng = np.random.default_rng(0)
+        users = rng.integers(1, options['users'] + 1, options['edges'])
+        # Авторы распределены по Ципфу: немного популярных, много тихих.
+        authors = np.minimum(
+            rng.zipf(1.5, options['edges']), options['users']
+        )
+        started = time.perf_counter()
+        matrix = FollowMatrix(users, authors)
+        built = time.perf_counter() - started
+        rows = np.flatnonzero(matrix.degrees(np.arange(matrix.size)))
+        stored = 0
+        started = time.perf_counter()
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            stored += len(matrix.suggest(batch, top_k)[0])
+        suggested = time.perf_counter() - started
+        self.stdout.write(
+            f'рёбер {options["edges"]}: матрица {built:.2f} с, '
+            f'предложения {suggested:.2f} с, строк {stored}'
+        )
@@ -0,0 +1,106 @@
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from posts import trending
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пересчёт рейтингов популярного на N постах. '
+        'Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.bench_formula(options['posts'])
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.populate(options['posts'], options['authors'])
+            self.stdout.write(
+                f'данные: {time.perf_counter() - started:.1f} с'
+            )
+            started = time.perf_counter()
+            scored = trending.recompute(options['batch_size'])
+            self.stdout.write(
+                f'пересчёт {scored} постов: '
+                f'{time.perf_counter() - started:.2f} с'
+            )
+            transaction.set_rollback(True)
+
+    def bench_formula(self, size):
+        """Сама формула: векторно против цикла Python."""
+        rng = np.random.default_rng(0)
+        comments = rng.integers(0, 50, size)
+        followers = rng.integers(0, 10000, size)
+        published = trending.EPOCH + rng.random(size) * 1e8
+        started = time.perf_counter()
+        trending.rank(comments, followers, published)
+        vector = time.perf_counter() - started
+        started = time.perf_counter()
+        for index in range(size):
+            trending.rank(
+                comments[index], followers[index], published[index]
+            )
+        loop = time.perf_counter() - started
+        self.stdout.write(
+            f'формула на {size}: NumPy {vector * 1000:.1f} мс, '
+            f'поэлементно {loop * 1000:.1f} мс'
+        )
+
+    def populate(self, posts, authors):
+        prefix = f'bench-{time.monotonic_ns()}'
+        User.objects.bulk_create(
+            User(username=f'{prefix}-{number}') for number in range(authors)
+        )
+        author_ids = list(
+            User.objects.filter(username__startswith=f'{prefix}-')
+            .values_list('id', flat=True)
+        )
+        Follow.objects.bulk_create(
+            (
+                Follow(user_id=reader, author_id=author)
+                for reader, author in zip(author_ids, author_ids[1:])
+            ),
+            batch_size=500,
+        )
+        first_id = (Post.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0) + 1
+        Post.objects.bulk_create(
+            (
+                Post(author_id=author_ids[number % authors], text='Пост')
+                for number in range(posts)
+            ),
+            batch_size=500,
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    post_id=first_id + (number * 7919) % posts,
+                    author_id=author_ids[number % authors],
+                    text='Комментарий',
+                )
+                for number in range(posts // 10)
+            ),
+            batch_size=500,
+        )
+        # auto_now_add ставит всем одну дату, разносим посты по неделе.
+        now = timezone.now()
+        Post.objects.filter(id__gte=first_id).update(pub_date=now)
+        for hours in range(0, 24 * 7, 12):
+            Post.objects.filter(
+                id__gte=first_id + posts * hours // (24 * 7),
+            ).update(pub_date=now - timedelta(hours=hours))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.syndication import rebuild_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает на диске изменившиеся сегменты карты сайта'
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_sitemaps()
+        self.stdout.write(f'Пересобрано сегментов: {rebuilt}')
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.transfer import export_lines
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает группы, посты, комментарии и подписки в NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=None,
+            help='Файл для выгрузки; по умолчанию stdout',
+        )
+        parser.add_argument(
+            '--user', default=None,
+            help='Выгрузить только данные этого пользователя',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Количество строк, читаемых из БД за раз',
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден'
+                )
+        lines = export_lines(user=user, chunk_size=options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            file.writelines(lines)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.queries import page_memory_report
+from posts.views import posts_on_page
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает память на страницу ленты для разных проекций'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=posts_on_page)
+
+    def handle(self, *args, **options):
+        report = page_memory_report(Post.objects.all(), options['page_size'])
+        for name, size in report.items():
+            saved = report['full'] - size
+            self.stdout.write(
+                f'{name:>5}: {size} байт, экономия {saved} байт'
+            )
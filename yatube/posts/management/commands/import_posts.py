@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import import_lines
+
+
+class Command(BaseCommand):
+    help = 'Загружает NDJSON, созданный export_posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл NDJSON или - для stdin')
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Количество записей в одном bulk_create',
+        )
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            counts = import_lines(sys.stdin, options['batch_size'])
+        else:
+            with open(options['path'], encoding='utf-8') as file:
+                counts = import_lines(file, options['batch_size'])
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count}')
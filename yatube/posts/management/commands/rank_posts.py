@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+from core.models import Job
+from posts import tasks, trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги ленты популярного'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Постов в одной пачке пересчёта',
+        )
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Поставить периодический пересчёт в фоновую очередь',
+        )
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            if not Job.objects.filter(
+                name=tasks.recompute_trending.job_name, status=Job.QUEUED
+            ).exists():
+                jobs.enqueue(tasks.recompute_trending)
+            self.stdout.write('Пересчёт поставлен в очередь')
+            return
+        started = time.perf_counter()
+        scored = trending.recompute(options['batch_size'])
+        self.stdout.write(
+            f'Рейтинг постов: {scored} за '
+            f'{time.perf_counter() - started:.2f} с'
+        )
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.recommend import recompute
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает предложения «Кого почитать» по графу подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Пользователей в одной пачке',
+        )
+        parser.add_argument(
+            '--top-k', type=int, default=None,
+            help='Сколько предложений хранить на пользователя',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stored = recompute(options['batch_size'], options['top_k'])
+        self.stdout.write(
+            f'Сохранено предложений: {stored} за '
+            f'{time.perf_counter() - started:.2f} с'
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import restore_posts
+
+
+class Command(BaseCommand):
+    help = 'Возвращает архивные посты в основную таблицу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('post_ids', nargs='+', type=int)
+
+    def handle(self, *args, **options):
+        restored = restore_posts(options['post_ids'])
+        self.stdout.write(f'Восстановлено постов: {restored}')
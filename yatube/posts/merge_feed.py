@@ -0,0 +1,138 @@
+"""Лента подписок слиянием k отсортированных потоков (fan-out on read).
+
+Каждый автор — поток своих постов по индексу (author_id, pub_date).
+Куча хранит голову каждого потока; страница собирается извлечением
+page_size самых новых голов. Состояние кучи после страницы кладётся в кэш,
+и следующая страница продолжает слияние с того же места.
+"""
+import heapq
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+
+from . import graph
+from .models import Post
+from .queries import feed_queryset
+
+
+def _batches(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _entry(author_id, pub_date, post_id=0):
+    # heapq — min-куча, поэтому новые посты получают меньший ключ.
+    # post_id=0 — голова потока, которую ещё не читали из БД.
+    return (-pub_date.timestamp(), -post_id, author_id, pub_date)
+
+
+class MergeFeed:
+    """Последовательность для Paginator поверх потоков авторов."""
+
+    def __init__(self, user):
+        self.user_id = user.id
+        self.author_ids = list(graph.followings(user.id))
+        self.batch_size = settings.FOLLOW_GRAPH_IN_LIMIT
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = sum(
+                Post.objects.visible().filter(author_id__in=batch).count()
+                for batch in _batches(self.author_ids, self.batch_size)
+            )
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def _state_key(self, offset):
+        return f'merge_feed:{self.user_id}:{self.count()}:{offset}'
+
+    def _initial_heap(self):
+        """Голова каждого потока — дата самого нового поста автора."""
+        heap = []
+        for batch in _batches(self.author_ids, self.batch_size):
+            latest = (
+                Post.objects.visible().filter(author_id__in=batch)
+                .values('author_id')
+                .annotate(latest=Max('pub_date'))
+                .order_by()
+            )
+            heap.extend(
+                _entry(row['author_id'], row['latest']) for row in latest
+            )
+        heapq.heapify(heap)
+        return {'heap': heap, 'buffers': {}}
+
+    def _refill(self, state, author_id, pub_date, post_id, size):
+        """Читает посты автора по индексу начиная с курсора."""
+        posts = Post.objects.visible().filter(author_id=author_id)
+        if post_id:
+            posts = posts.filter(
+                Q(pub_date__lt=pub_date)
+                | Q(pub_date=pub_date, id__lt=post_id)
+            )
+        else:
+            posts = posts.filter(pub_date__lte=pub_date)
+        state['buffers'][author_id] = list(
+            posts.order_by('-pub_date', '-id')
+            .values_list('pub_date', 'id')[:size]
+        )
+
+    def _push_next(self, state, author_id):
+        buffer = state['buffers'].get(author_id)
+        if buffer:
+            next_date, next_id = buffer.pop(0)
+            heapq.heappush(
+                state['heap'], _entry(author_id, next_date, next_id)
+            )
+        else:
+            state['buffers'].pop(author_id, None)
+
+    def _advance(self, state, size):
+        """Извлекает size самых новых постов, сдвигая курсоры авторов."""
+        heap, buffers = state['heap'], state['buffers']
+        taken = []
+        while heap and len(taken) < size:
+            _, neg_id, author_id, pub_date = heapq.heappop(heap)
+            post_id = -neg_id
+            if not post_id:
+                self._refill(state, author_id, pub_date, 0, size + 1)
+                self._push_next(state, author_id)
+                continue
+            taken.append(post_id)
+            if not buffers.get(author_id):
+                self._refill(state, author_id, pub_date, post_id, size)
+            self._push_next(state, author_id)
+        return taken
+
+    def _state_at(self, offset, size):
+        state = cache.get(self._state_key(offset))
+        if state is not None:
+            return state
+        state = self._initial_heap()
+        # Холодный переход сразу на дальнюю страницу: проматываем слияние.
+        position = 0
+        while position < offset:
+            step = min(max(size, 1), offset - position)
+            self._advance(state, step)
+            position += step
+        return state
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = self.count() if index.stop is None else index.stop
+        size = max(stop - start, 0)
+        state = self._state_at(start, size)
+        ids = self._advance(state, size)
+        cache.set(
+            self._state_key(start + len(ids)),
+            state,
+            settings.MERGE_FEED_STATE_TIMEOUT,
+        )
+        posts = feed_queryset(Post.objects.visible()).in_bulk(ids)
+        return [posts[post_id] for post_id in ids if post_id in posts]
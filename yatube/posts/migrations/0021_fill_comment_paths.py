@@ -0,0 +1,34 @@
+from django.db import migrations
+
+CHUNK_SIZE = 500
+
+
+def fill_paths(apps, schema_editor):
+    # До веток все комментарии были корневыми: путь — собственный id
+    # шириной posts.threads.WIDTH.
+    for name in ('Comment', 'ArchivedComment'):
+        model = apps.get_model('posts', name)
+        last_id = 0
+        while True:
+            comments = list(
+                model.objects.filter(path='', id__gt=last_id)
+                .order_by('id').only('id')[:CHUNK_SIZE]
+            )
+            if not comments:
+                break
+            for comment in comments:
+                comment.path = f'{comment.id:010d}/'
+                comment.depth = 0
+            model.objects.bulk_update(comments, ['path', 'depth'])
+            last_id = comments[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_notification'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -1,19 +1,28 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from .validators import validate_not_empty
+from .text import make_excerpt, render_html
+from . import graph, live, notifications, tags, threads, trending
 from core.models import CreatedModel
 
 
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """Посты без авторов, чьи аккаунты ждут удаления."""
+        return self.filter(author__is_active=True)
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст',
         help_text='Введите текст поста',
         validators=[validate_not_empty]
     )
-    pub_date = models.DateTimeField(auto_now_add=True)
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -33,12 +42,45 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    excerpt = models.TextField('Выдержка', blank=True, editable=False)
+    text_html = models.TextField('Текст в HTML', blank=True, editable=False)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+    views = models.PositiveIntegerField('Просмотры', default=0)
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
-        return self.text[:15]
+        return self.excerpt[:15]
+
+    def render_text(self):
+        """Заполняет выдержку и HTML, чтобы не считать их на каждый запрос."""
+        self.excerpt = make_excerpt(self.text)
+        self.text_html = render_html(self.text)
+
+    def save(self, *args, **kwargs):
+        self.render_text()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt', 'text_html'}
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if update_fields is None or 'text' in update_fields:
+            mentions = tags.index_posts([self], fresh=adding)
+            if mentions:
+                notifications.after_commit(
+                    notifications.mentioned, self, mentions
+                )
+        if adding:
+            transaction.on_commit(live.notifier.notify)
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date'],
+                name='post_author_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -74,10 +116,43 @@ class Comment(CreatedModel):
         help_text='Введите текст комментария',
         validators=[validate_not_empty]
     )
+    parent = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='replies',
+        verbose_name='Ответ на',
+    )
+    # Материализованный путь ветки, см. posts.threads.
+    path = models.CharField('Путь', max_length=255, blank=True)
+    depth = models.PositiveSmallIntegerField('Глубина', default=0)
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        parent = self.parent if adding else None
+        if parent is not None:
+            self.depth = min(parent.depth + 1, settings.COMMENT_MAX_DEPTH)
+            if parent.depth >= settings.COMMENT_MAX_DEPTH:
+                # Глубже предела ответ становится соседом родителя.
+                self.parent_id = parent.parent_id
+                self._meta.get_field('parent').delete_cached_value(self)
+        super().save(*args, **kwargs)
+        if adding:
+            # Путь содержит собственный id, поэтому пишется после INSERT.
+            self.path = threads.child_path(parent, self.pk)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+            post_id = self.post_id
+            transaction.on_commit(lambda: trending.score_post(post_id))
 
     def __str__(self):
         return self.text[:15]
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'path'], name='comment_thread_idx'),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -91,6 +166,18 @@ class Follow(models.Model):
         related_name='following',
     )
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            graph.forget([(self.user_id, self.author_id)])
+            notifications.after_commit(notifications.followed, self)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        graph.forget([(self.user_id, self.author_id)])
+        return result
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -102,3 +189,333 @@ class Follow(models.Model):
                 name='cant_follow_urself'
             )
         ]
+
+
+class ArchivedPost(models.Model):
+    """Холодная копия поста, перенесённого из основной таблицы."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField(db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        'Group',
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа',
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    excerpt = models.TextField('Выдержка', blank=True)
+    text_html = models.TextField('Текст в HTML', blank=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+    views = models.PositiveIntegerField('Просмотры', default=0)
+    archived = models.DateTimeField('Дата архивации', auto_now_add=True)
+
+    def __str__(self):
+        return self.excerpt[:15]
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+
+class ArchivedComment(models.Model):
+    """Холодная копия комментария к архивному посту."""
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        'ArchivedPost',
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Пост',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    created = models.DateTimeField('Дата создания')
+    parent_id = models.IntegerField('Ответ на', null=True, blank=True)
+    path = models.CharField('Путь', max_length=255, blank=True)
+    depth = models.PositiveSmallIntegerField('Глубина', default=0)
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['post', 'path'], name='archived_comment_thread_idx'
+            ),
+        ]
+
+
+class PostScore(models.Model):
+    """Рейтинг поста в ленте популярного (posts.trending)."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+    )
+    score = models.FloatField('Рейтинг')
+    computed = models.DateTimeField('Дата расчёта', auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-score', '-post'], name='post_score_rank_idx'
+            ),
+        ]
+        verbose_name = 'Рейтинг поста'
+        verbose_name_plural = 'Рейтинги постов'
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.3f}'
+
+
+class FollowSuggestion(models.Model):
+    """Предложение подписки из posts.recommend; user=None — общий список."""
+    user = models.ForeignKey(
+        User,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    rank = models.PositiveSmallIntegerField('Место')
+    score = models.FloatField('Оценка')
+    computed = models.DateTimeField('Дата расчёта')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'rank'], name='follow_suggestion_user_idx'
+            ),
+        ]
+        verbose_name = 'Предложение подписки'
+        verbose_name_plural = 'Предложения подписок'
+
+    def __str__(self):
+        return f'{self.user_id} → {self.author_id}'
+
+
+REACTIONS = (
+    ('like', '👍'),
+    ('heart', '❤️'),
+    ('laugh', '😄'),
+    ('sad', '😢'),
+)
+
+
+class Reaction(models.Model):
+    """Реакция пользователя на пост или комментарий: одна на цель."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+    )
+    post = models.ForeignKey(
+        Post,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+    )
+    comment = models.ForeignKey(
+        Comment,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+    )
+    kind = models.CharField('Реакция', max_length=16, choices=REACTIONS)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_post_reaction'
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'comment'],
+                name='unique_comment_reaction'
+            ),
+            models.CheckConstraint(
+                check=(
+                    models.Q(post__isnull=False, comment__isnull=True)
+                    | models.Q(post__isnull=True, comment__isnull=False)
+                ),
+                name='reaction_single_target'
+            ),
+        ]
+        verbose_name = 'Реакция'
+        verbose_name_plural = 'Реакции'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.kind}'
+
+
+class ReactionCounter(models.Model):
+    """Шард счётчика реакций; итог по цели — сумма её шардов."""
+    target = models.CharField('Цель', max_length=32)
+    kind = models.CharField('Реакция', max_length=16, choices=REACTIONS)
+    shard = models.PositiveSmallIntegerField('Шард')
+    count = models.IntegerField('Число', default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['target', 'kind', 'shard'],
+                name='unique_reaction_shard'
+            ),
+        ]
+        verbose_name = 'Счётчик реакций'
+        verbose_name_plural = 'Счётчики реакций'
+
+    def __str__(self):
+        return f'{self.target} {self.kind}[{self.shard}] = {self.count}'
+
+
+class Tag(models.Model):
+    """Хэштег; имя хранится в нижнем регистре без «#»."""
+    name = models.CharField('Тег', max_length=50, unique=True)
+
+    class Meta:
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """Связь поста с тегом; дата поста продублирована для ленты тега."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='tag_links',
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_links',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'tag'],
+                name='unique_post_tag'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['tag', '-pub_date', '-post'],
+                name='post_tag_feed_idx',
+            ),
+        ]
+
+
+class Mention(models.Model):
+    """Упоминание пользователя в посте через @username."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'user'],
+                name='unique_mention'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-post'], name='mention_user_idx'
+            ),
+        ]
+        verbose_name = 'Упоминание'
+        verbose_name_plural = 'Упоминания'
+
+
+class Notification(models.Model):
+    """Уведомление во входящих пользователя (posts.notifications)."""
+    FOLLOW = 'follow'
+    COMMENT = 'comment'
+    REPLY = 'reply'
+    MENTION = 'mention'
+    KINDS = (
+        (FOLLOW, 'Подписка'),
+        (COMMENT, 'Комментарий'),
+        (REPLY, 'Ответ'),
+        (MENTION, 'Упоминание'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    kind = models.CharField('Событие', max_length=16, choices=KINDS)
+    post = models.ForeignKey(
+        Post,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    comment = models.ForeignKey(
+        Comment,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    unread = models.BooleanField('Не прочитано', default=True)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['recipient', '-id'], name='notification_inbox_idx'
+            ),
+            models.Index(
+                fields=['recipient', 'unread'],
+                name='notification_unread_idx',
+            ),
+        ]
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+    def __str__(self):
+        return f'{self.recipient_id}: {self.kind}'
@@ -0,0 +1,134 @@
+"""Уведомления о подписках, комментариях, ответах и упоминаниях.
+
+Событие раскладывается на получателей одним bulk INSERT уже после
+коммита транзакции, в которой оно произошло: подписка в запросе так и
+остаётся одним INSERT. Число непрочитанных считается по индексу
+(recipient, unread) и кэшируется на NOTIFICATION_UNREAD_TIMEOUT секунд.
+Кэш у каждого процесса свой, поэтому доставка и прочтение ключ не
+правят, а удаляют: в других процессах старое значение доживёт не дольше
+таймаута. Шапка страницы читает только этот ключ.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def deliver(notifications):
+    """Сохраняет уведомления пачкой и сбрасывает счётчики получателей."""
+    from .models import Notification
+
+    notifications = [
+        notification for notification in notifications
+        if notification.recipient_id != notification.actor_id
+    ]
+    if not notifications:
+        return []
+    Notification.objects.bulk_create(notifications)
+    forget({notification.recipient_id for notification in notifications})
+    return notifications
+
+
+def after_commit(func, *args):
+    transaction.on_commit(lambda: func(*args))
+
+
+def followed(follow):
+    from .models import Notification
+
+    return deliver([Notification(
+        recipient_id=follow.author_id,
+        actor_id=follow.user_id,
+        kind=Notification.FOLLOW,
+    )])
+
+
+def commented(comment):
+    """Автору поста — о комментарии, автору родителя — об ответе."""
+    from .models import Comment, Notification
+
+    post_author_id = comment.post.author_id
+    notifications = [Notification(
+        recipient_id=post_author_id,
+        actor_id=comment.author_id,
+        kind=Notification.COMMENT,
+        post_id=comment.post_id,
+        comment_id=comment.id,
+    )]
+    if comment.parent_id:
+        parent_author_id = Comment.objects.filter(
+            id=comment.parent_id
+        ).values_list('author_id', flat=True).first()
+        if parent_author_id not in (None, post_author_id):
+            notifications.append(Notification(
+                recipient_id=parent_author_id,
+                actor_id=comment.author_id,
+                kind=Notification.REPLY,
+                post_id=comment.post_id,
+                comment_id=comment.id,
+            ))
+    return deliver(notifications)
+
+
+def mentioned(post, mentions):
+    from .models import Notification
+
+    return deliver([
+        Notification(
+            recipient_id=mention.user_id,
+            actor_id=post.author_id,
+            kind=Notification.MENTION,
+            post_id=post.id,
+        )
+        for mention in mentions
+    ])
+
+
+def unread_count(user):
+    """Непрочитанные: одно чтение кэша, при промахе — COUNT по индексу."""
+    from .models import Notification
+
+    key = unread_key(user.id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient=user, unread=True, actor__is_active=True
+        ).count()
+        cache.add(key, count, settings.NOTIFICATION_UNREAD_TIMEOUT)
+    return count
+
+
+def mark_read(user):
+    from .models import Notification
+
+    Notification.objects.filter(recipient=user, unread=True).update(
+        unread=False
+    )
+    cache.delete(unread_key(user.id))
+
+
+def forget(recipient_ids):
+    """Сбрасывает счётчики: их пересчитает из БД следующее чтение."""
+    cache.delete_many([unread_key(user_id) for user_id in recipient_ids])
+
+
+def inbox_page(user, before=None, size=None):
+    """Страница входящих по курсору: уведомления с id меньше before.
+
+    Возвращает список и курсор следующей страницы (None в конце).
+    """
+    from .models import Notification
+
+    size = size or settings.NOTIFICATIONS_PAGE_SIZE
+    notifications = Notification.objects.filter(
+        recipient=user, actor__is_active=True
+    ).select_related('actor').order_by('-id')
+    if before is not None:
+        notifications = notifications.filter(id__lt=before)
+    rows = list(notifications[:size + 1])
+    if len(rows) > size:
+        return rows[:size], rows[size - 1].id
+    return rows, None
@@ -0,0 +1,95 @@
+"""Общие запросы лент: только те колонки, что рисует карточка поста."""
+import tracemalloc
+
+FEED_FIELDS = (
+    'id',
+    'excerpt',
+    'pub_date',
+    'image',
+    'updated_at',
+    'views',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+    'group__title',
+)
+
+
+def feed_queryset(posts):
+    """Проекция ленты: автор и группа одним JOIN, без лишних колонок."""
+    return posts.select_related('author', 'group').only(*FEED_FIELDS)
+
+
+class FeedAuthor:
+    __slots__ = ('username', 'first_name', 'last_name')
+
+    def __init__(self, username, first_name, last_name):
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def __str__(self):
+        return self.username
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+
+class FeedGroup:
+    __slots__ = ('slug', 'title')
+
+    def __init__(self, slug, title):
+        self.slug = slug
+        self.title = title
+
+
+class FeedRow:
+    """Компактная строка ленты без экземпляров моделей."""
+    __slots__ = (
+        'id', 'excerpt', 'pub_date', 'image', 'views', 'author', 'group',
+    )
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.excerpt = row['excerpt']
+        self.pub_date = row['pub_date']
+        self.image = row['image']
+        self.views = row['views']
+        self.author = FeedAuthor(
+            row['author__username'],
+            row['author__first_name'],
+            row['author__last_name'],
+        )
+        self.group = None
+        if row['group__slug'] is not None:
+            self.group = FeedGroup(row['group__slug'], row['group__title'])
+
+
+def feed_rows(posts):
+    """Строки ленты через values(), минуя конструирование моделей."""
+    return [FeedRow(row) for row in posts.values(*FEED_FIELDS)]
+
+
+def _allocated(load):
+    # Первый прогон прогревает компиляцию запроса и кэши Django.
+    load()
+    tracemalloc.start()
+    try:
+        result = load()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def page_memory_report(posts, page_size):
+    """Память на страницу ленты: полные модели против проекций."""
+    return {
+        'full': _allocated(
+            lambda: list(posts.select_related('author')[:page_size])
+        ),
+        'only': _allocated(lambda: list(feed_queryset(posts)[:page_size])),
+        'rows': _allocated(lambda: feed_rows(posts[:page_size])),
+    }
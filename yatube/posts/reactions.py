@@ -0,0 +1,184 @@
+"""Реакции на посты и комментарии с шардированными счётчиками.
+
+Реакция — строка Reaction, уникальная по (user, post) или (user, comment):
+у пользователя одна реакция на цель. Число реакций не хранится в строке
+поста: на пару (цель, вид) приходится до REACTION_COUNTER_SHARDS строк
+ReactionCounter, и каждое изменение прибавляет ±1 к случайному шарду.
+Одновременные лайки популярного поста поэтому не ждут блокировку одной
+строки. Итог — SUM по шардам; отдельный шард может уйти в минус, сумма —
+нет.
+
+Для страницы ленты attach() делает два запроса: суммы счётчиков и
+реакции зрителя на все объекты страницы.
+"""
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import (
+    REACTIONS, ArchivedComment, ArchivedPost, Comment, Reaction,
+    ReactionCounter,
+)
+
+KINDS = dict(REACTIONS)
+ARCHIVED = (ArchivedPost, ArchivedComment)
+
+
+def _field(target):
+    if isinstance(target, (Comment, ArchivedComment)):
+        return 'comment'
+    return 'post'
+
+
+def target_key(target):
+    """Ключ счётчика: 'post:12' или 'comment:5'.
+
+    Архивные пост и комментарий сохраняют id и делят ключ с исходными.
+    """
+    return f'{_field(target)}:{target.pk}'
+
+
+def _bump(key, kind, delta):
+    shard = random.randrange(settings.REACTION_COUNTER_SHARDS)
+    counter = ReactionCounter.objects.filter(
+        target=key, kind=kind, shard=shard
+    )
+    if counter.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            ReactionCounter.objects.create(
+                target=key, kind=kind, shard=shard, count=delta
+            )
+    except IntegrityError:
+        counter.update(count=F('count') + delta)
+
+
+def react(user, target, kind):
+    """Ставит реакцию kind; возвращает True, если что-то изменилось.
+
+    Первая реакция — один INSERT; смена вида переносит единицу счётчика.
+    """
+    if kind not in KINDS:
+        raise ValueError(f'Неизвестная реакция: {kind}')
+    field = _field(target)
+    key = target_key(target)
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Reaction.objects.create(user=user, kind=kind, **{
+                    field: target
+                })
+        except IntegrityError:
+            reaction = Reaction.objects.select_for_update().get(
+                user=user, **{field: target}
+            )
+            if reaction.kind == kind:
+                return False
+            _bump(key, reaction.kind, -1)
+            reaction.kind = kind
+            reaction.save(update_fields=['kind'])
+        _bump(key, kind, 1)
+    return True
+
+
+def unreact(user, target):
+    """Снимает реакцию; возвращает True, если она была."""
+    field = _field(target)
+    with transaction.atomic():
+        reaction = Reaction.objects.select_for_update().filter(
+            user=user, **{field: target}
+        ).first()
+        if reaction is None:
+            return False
+        reaction.delete()
+        _bump(target_key(target), reaction.kind, -1)
+    return True
+
+
+def delete_reactions(objects):
+    """Удаляет пачку реакций; счётчик каждой пары (цель, вид) — одним
+    изменением."""
+    Reaction.objects.filter(id__in=[obj.id for obj in objects]).delete()
+    removed = Counter(
+        (
+            f'post:{obj.post_id}' if obj.post_id
+            else f'comment:{obj.comment_id}',
+            obj.kind,
+        )
+        for obj in objects
+    )
+    for (key, kind), count in removed.items():
+        _bump(key, kind, -count)
+
+
+def drop_counters(field, ids):
+    """Удаляет счётчики целей, чьи строки Reaction удалены каскадом."""
+    ReactionCounter.objects.filter(
+        target__in=[f'{field}:{pk}' for pk in ids]
+    ).delete()
+
+
+def counts(keys):
+    """Суммы шардов одним запросом: {ключ: {вид: число}}."""
+    totals = {}
+    rows = (
+        ReactionCounter.objects.filter(target__in=list(keys))
+        .values('target', 'kind')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    for row in rows:
+        if row['total']:
+            totals.setdefault(row['target'], {})[row['kind']] = row['total']
+    return totals
+
+
+def attach(objects, user):
+    """Проставляет объектам страницы reaction_counts и my_reaction.
+
+    reaction_counts — список (вид, значок, число) в порядке REACTIONS.
+    Реакции зрителя читаются одним запросом на всю страницу; у архивных
+    объектов реакции заморожены, и my_reaction у них всегда None.
+    """
+    objects = list(objects)
+    if not objects:
+        return objects
+    totals = counts(target_key(obj) for obj in objects)
+    mine = {}
+    live = [obj for obj in objects if not isinstance(obj, ARCHIVED)]
+    if live and user.is_authenticated:
+        field = _field(live[0])
+        mine = dict(
+            Reaction.objects.filter(
+                user=user, **{f'{field}_id__in': [obj.pk for obj in live]}
+            ).values_list(f'{field}_id', 'kind')
+        )
+    for obj in objects:
+        total = totals.get(target_key(obj), {})
+        obj.reaction_counts = [
+            (kind, label, total.get(kind, 0)) for kind, label in REACTIONS
+        ]
+        obj.my_reaction = (
+            None if isinstance(obj, ARCHIVED) else mine.get(obj.pk)
+        )
+    return objects
+
+
+def attach_page(page, user):
+    page.object_list = attach(page.object_list, user)
+    return page
+
+
+def state(user, target):
+    """Ответ JSON-эндпоинта: своя реакция и суммы по видам."""
+    attach([target], user)
+    return {
+        'reaction': target.my_reaction,
+        'counts': {
+            kind: count for kind, _, count in target.reaction_counts
+        },
+    }
@@ -0,0 +1,177 @@
+"""«Кого почитать»: предложения подписок по графу подписок.
+
+Граф хранится разреженной матрицей пользователь × автор в формате CSR
+(массивы NumPy indptr/indices). Оценка автора w для пользователя u —
+число путей u → v → w: сколько авторов, на которых подписан u, сами
+подписаны на w (друзья друзей). При равенстве путей выше более популярный
+w: к оценке добавляется его доля популярности, меньшая единицы.
+Строки считаются пачками пользователей без циклов Python по рёбрам:
+пути разворачиваются через np.repeat, а повторы складываются np.unique.
+
+Результат — top-K строк FollowSuggestion на пользователя; страницы
+читают их одним запросом по индексу (user, rank). Строки с user=None —
+самые популярные авторы для тех, у кого своих предложений нет.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import graph
+from .models import Follow, FollowSuggestion
+
+
+class FollowMatrix:
+    """Граф подписок в CSR с плотной нумерацией id пользователей."""
+
+    def __init__(self, user_ids, author_ids):
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        author_ids = np.asarray(author_ids, dtype=np.int64)
+        self.ids, inverse = np.unique(
+            np.concatenate([user_ids, author_ids]), return_inverse=True
+        )
+        rows, cols = np.split(inverse, 2)
+        order = np.lexsort((cols, rows))
+        self.indices = cols[order]
+        size = len(self.ids)
+        self.indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=size), out=self.indptr[1:])
+        self.popularity = np.bincount(cols, minlength=size)
+
+    @property
+    def size(self):
+        return len(self.ids)
+
+    def degrees(self, rows):
+        return self.indptr[rows + 1] - self.indptr[rows]
+
+    def expand(self, rows):
+        """Все пары (строка, столбец) для данных строк, векторно."""
+        lengths = self.degrees(rows)
+        starts = self.indptr[rows]
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        return owner, self.indices[np.repeat(starts, lengths) + offsets]
+
+    def suggest(self, rows, top_k):
+        """Top-K авторов для пачки строк: (строка, автор, оценка, место)."""
+        owner, followed = self.expand(rows)
+        # Второй шаг пути: подписки тех, на кого подписан пользователь.
+        step_owner, candidate = self.expand(followed)
+        user = owner[step_owner]
+        keys = user * self.size + candidate
+        keys, paths = np.unique(keys, return_counts=True)
+        user, candidate = np.divmod(keys, self.size)
+        known = np.isin(
+            keys, owner * self.size + followed, assume_unique=False
+        ) | (candidate == rows[user])
+        user, candidate = user[~known], candidate[~known]
+        score = paths[~known] + (
+            self.popularity[candidate] / (self.popularity.max() + 1)
+        )
+        order = np.lexsort((-score, user))
+        user, candidate, score = user[order], candidate[order], score[order]
+        first = np.searchsorted(user, user)
+        rank = np.arange(len(user)) - first
+        keep = rank < top_k
+        return (
+            self.ids[rows[user[keep]]],
+            self.ids[candidate[keep]],
+            score[keep],
+            rank[keep],
+        )
+
+    def popular(self, top_k):
+        order = np.argsort(-self.popularity, kind='stable')[:top_k]
+        order = order[self.popularity[order] > 0]
+        return self.ids[order], self.popularity[order].astype(float)
+
+
+def _edges():
+    rows = np.array(
+        Follow.objects.filter(
+            user__is_active=True, author__is_active=True
+        ).values_list('user_id', 'author_id'),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    return rows[:, 0], rows[:, 1]
+
+
+def _insert(rows, computed):
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(name)
+        for name in ('user_id', 'author_id', 'rank', 'score', 'computed')
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {quote(FollowSuggestion._meta.db_table)} '
+            f'({columns}) VALUES (%s, %s, %s, %s, %s)',
+            [(*row, computed) for row in rows],
+        )
+
+
+def recompute(batch_size=None, top_k=None):
+    """Пересчитывает предложения всех пользователей; возвращает число строк.
+
+    Пачка пользователей заменяется своей транзакцией; в конце удаляются
+    строки тех, кто больше ни на кого не подписан.
+    """
+    batch_size = batch_size or settings.FOLLOW_SUGGESTIONS_BATCH_SIZE
+    top_k = top_k or settings.FOLLOW_SUGGESTIONS_TOP_K
+    started = timezone.now()
+    computed = connection.ops.adapt_datetimefield_value(started)
+    matrix = FollowMatrix(*_edges())
+    authors, scores = matrix.popular(top_k)
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user=None).delete()
+        _insert(
+            (
+                (None, author, rank, score)
+                for rank, (author, score) in enumerate(
+                    zip(authors.tolist(), scores.tolist())
+                )
+            ),
+            computed,
+        )
+    users = np.flatnonzero(matrix.degrees(np.arange(matrix.size)))
+    stored = len(authors)
+    for start in range(0, len(users), batch_size):
+        rows = users[start:start + batch_size]
+        owners, authors, scores, ranks = (
+            column.tolist() for column in matrix.suggest(rows, top_k)
+        )
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(
+                user_id__in=matrix.ids[rows].tolist()
+            ).delete()
+            _insert(zip(owners, authors, ranks, scores), computed)
+        stored += len(authors)
+    FollowSuggestion.objects.filter(computed__lt=started).delete()
+    return stored
+
+
+def suggestions(user, limit=None):
+    """Предложения для user: свои, а если их нет — общие популярные.
+
+    Авторов, на которых user подписался после расчёта, отсекает
+    закэшированный граф подписок, так что подписка остаётся одним INSERT.
+    """
+    limit = limit or settings.FOLLOW_SUGGESTIONS_SHOWN
+    top_k = settings.FOLLOW_SUGGESTIONS_TOP_K
+    rows = list(
+        FollowSuggestion.objects.filter(user=user)
+        .select_related('author').order_by('rank')[:top_k]
+    )
+    if not rows:
+        rows = list(
+            FollowSuggestion.objects.filter(user=None)
+            .select_related('author').order_by('rank')[:top_k]
+        )
+    followed = set(graph.followings(user.id))
+    return [
+        row.author for row in rows
+        if row.author_id != user.id and row.author_id not in followed
+    ][:limit]
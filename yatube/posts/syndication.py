@@ -0,0 +1,382 @@
+"""RSS/Atom-ленты и карта сайта, собираемые инкрементально и хранимые на диске.
+
+Каждый файл сопровождается маркером — числом записей и датой последнего
+изменения в его области. Файл пересобирается, только если маркер изменился,
+а клиенты с совпавшим ETag или Last-Modified получают 304 без обращения
+к файлу.
+"""
+import hashlib
+import os
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.db.models import Count, F, Max
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+
+from . import tags
+from .models import Group, Post, Tag
+
+User = get_user_model()
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def scope_marker(posts):
+    """Маркер области: число постов и последнее изменение."""
+    state = posts.order_by().aggregate(
+        total=Count('id'), latest=Max('updated_at')
+    )
+    latest = state['latest'].timestamp() if state['latest'] else 0
+    return f'{state["total"]}-{latest}', state['latest']
+
+
+def _path(name):
+    return os.path.join(settings.FEEDS_CACHE_DIR, name)
+
+
+def _read(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def _write(path, content):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+
+
+def cached_file(name, marker, build):
+    """Содержимое файла name; build() вызывается, только если маркер новый.
+
+    Возвращает пару (содержимое, был ли файл пересобран).
+    """
+    os.makedirs(settings.FEEDS_CACHE_DIR, exist_ok=True)
+    path, marker_path = _path(name), _path(f'{name}.marker')
+    try:
+        if _read(marker_path).decode() == marker:
+            return _read(path), False
+    except FileNotFoundError:
+        pass
+    content = build()
+    _write(path, content)
+    _write(marker_path, marker.encode())
+    return content, True
+
+
+def conditional(request, marker, latest, content_type, load):
+    """Ответ с ETag и Last-Modified; load() вызывается только без 304."""
+    etag = '"{}"'.format(hashlib.md5(marker.encode()).hexdigest())
+    last_modified = latest.timestamp() if latest else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(load(), content_type=content_type)
+    response['ETag'] = etag
+    if latest:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние посты'
+    link = '/'
+    description = 'Новые записи всех авторов'
+
+    def scope(self, obj):
+        return Post.objects.visible()
+
+    def cache_name(self, obj):
+        return 'posts'
+
+    def items(self, obj):
+        return self.scope(obj).select_related('author')[
+            :settings.FEED_ITEMS
+        ]
+
+    def item_title(self, item):
+        return item.excerpt[:60]
+
+    def item_description(self, item):
+        return item.text_html
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.id,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    description = 'Новые записи группы'
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def scope(self, group):
+        return group.posts.visible()
+
+    def cache_name(self, group):
+        return f'group-{group.id}'
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def link(self, group):
+        return reverse('posts:group_posts', args=(group.slug,))
+
+
+class TagPostsFeed(LatestPostsFeed):
+    description = 'Новые записи с тегом'
+
+    def get_object(self, request, name):
+        return get_object_or_404(Tag, name=name.lower())
+
+    def scope(self, tag):
+        return tags.tag_posts(tag)
+
+    def cache_name(self, tag):
+        return f'tag-{tag.id}'
+
+    def title(self, tag):
+        return f'Yatube: #{tag.name}'
+
+    def link(self, tag):
+        return reverse('posts:tag', args=(tag.name,))
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    description = 'Новые записи автора'
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username, is_active=True)
+
+    def scope(self, author):
+        return author.posts.all()
+
+    def cache_name(self, author):
+        return f'author-{author.id}'
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=(author.username,))
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = GroupPostsFeed.description
+
+
+class TagPostsAtomFeed(TagPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = TagPostsFeed.description
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = AuthorPostsFeed.description
+
+
+def feed_view(feed_class):
+    """Представление ленты с кэшем на диске и условными ответами."""
+    feed = feed_class()
+    kind = 'atom' if feed.feed_type is Atom1Feed else 'rss'
+
+    def view(request, **kwargs):
+        obj = feed.get_object(request, **kwargs)
+        marker, latest = scope_marker(feed.scope(obj))
+        name = f'feed-{feed.cache_name(obj)}.{kind}.xml'
+        return conditional(
+            request, marker, latest, feed.feed_type.content_type,
+            lambda: cached_file(
+                name, marker, lambda: feed(request, **kwargs).content
+            )[0],
+        )
+    return view
+
+
+# Карта сайта: индекс и сегменты по диапазонам id.
+
+def _post_scope():
+    return Post.objects.visible(), Max('updated_at')
+
+
+def _profile_scope():
+    return User.objects.filter(is_active=True), Max('posts__updated_at')
+
+
+SCOPES = {
+    'posts': _post_scope,
+    'profiles': _profile_scope,
+}
+
+
+def segments(section):
+    """Все непустые сегменты раздела — GROUP BY по всей таблице."""
+    queryset, latest = SCOPES[section]()
+    size = settings.SITEMAP_SEGMENT_SIZE
+    rows = (
+        queryset.annotate(segment=F('id') / size)
+        .values('segment')
+        .annotate(total=Count('id', distinct=True), latest=latest)
+        .order_by('segment')
+    )
+    return {row['segment']: row for row in rows}
+
+
+def post_segments():
+    return segments('posts')
+
+
+def profile_segments():
+    return segments('profiles')
+
+
+def segment_row(section, segment):
+    """Маркер одного сегмента по его диапазону id или None, если он пуст."""
+    queryset, latest = SCOPES[section]()
+    start, stop = _segment_range(segment)
+    row = queryset.filter(id__gte=start, id__lt=stop).aggregate(
+        total=Count('id', distinct=True), latest=latest
+    )
+    return row if row['total'] else None
+
+
+def segment_marker(row):
+    latest = row['latest'].timestamp() if row['latest'] else 0
+    return f'{row["total"]}-{latest}'
+
+
+def _url(location, lastmod):
+    lastmod_tag = (
+        f'<lastmod>{lastmod.date().isoformat()}</lastmod>' if lastmod else ''
+    )
+    return f'<url><loc>{escape(location)}</loc>{lastmod_tag}</url>'
+
+
+def _urlset(urls):
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<urlset xmlns="{SITEMAP_NS}">{"".join(urls)}</urlset>\n'
+    ).encode()
+
+
+def _segment_range(segment):
+    size = settings.SITEMAP_SEGMENT_SIZE
+    return segment * size, (segment + 1) * size
+
+
+def build_posts_segment(segment):
+    start, stop = _segment_range(segment)
+    rows = Post.objects.visible().filter(
+        id__gte=start, id__lt=stop
+    ).order_by(
+        'id'
+    ).values_list('id', 'updated_at')
+    return _urlset(
+        _url(
+            settings.SITE_URL + reverse('posts:post_detail', args=(pk,)),
+            updated_at,
+        )
+        for pk, updated_at in rows
+    )
+
+
+def build_profiles_segment(segment):
+    start, stop = _segment_range(segment)
+    rows = (
+        User.objects.filter(id__gte=start, id__lt=stop, is_active=True)
+        .annotate(latest=Max('posts__updated_at'))
+        .order_by('id')
+        .values_list('username', 'latest')
+    )
+    return _urlset(
+        _url(
+            settings.SITE_URL + reverse('posts:profile', args=(username,)),
+            latest,
+        )
+        for username, latest in rows
+    )
+
+
+BUILDERS = {
+    'posts': build_posts_segment,
+    'profiles': build_profiles_segment,
+}
+
+
+def segment_file(section, segment, row):
+    return cached_file(
+        f'sitemap-{section}-{segment}.xml',
+        segment_marker(row),
+        lambda: BUILDERS[section](segment),
+    )
+
+
+def index_marker():
+    """Маркер индекса без группировки по сегментам.
+
+    Набор сегментов и их даты меняются только вместе с числом или датой
+    изменения видимых постов либо с числом и наибольшим id активных
+    пользователей. Возвращает маркер и дату последнего изменения.
+    """
+    posts, latest = scope_marker(Post.objects.visible())
+    users = User.objects.filter(is_active=True).aggregate(
+        total=Count('id'), last=Max('id')
+    )
+    return f'{posts}-{users["total"]}-{users["last"]}', latest
+
+
+def build_index():
+    entries = []
+    for section in SCOPES:
+        for segment, row in segments(section).items():
+            location = settings.SITE_URL + reverse(
+                'posts:sitemap_segment', args=(section, segment)
+            )
+            lastmod = ''
+            if row['latest']:
+                lastmod = f'<lastmod>{row["latest"].isoformat()}</lastmod>'
+            entries.append(
+                f'<sitemap><loc>{escape(location)}</loc>{lastmod}</sitemap>'
+            )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<sitemapindex xmlns="{SITEMAP_NS}">{"".join(entries)}'
+        '</sitemapindex>\n'
+    ).encode()
+
+
+def index_file(marker):
+    return cached_file('sitemap-index.xml', marker, build_index)
+
+
+def rebuild_sitemaps():
+    """Пересобирает только изменившиеся сегменты; возвращает их число."""
+    rebuilt = 0
+    for section in SCOPES:
+        for segment, row in segments(section).items():
+            _, changed = segment_file(section, segment, row)
+            rebuilt += changed
+    return rebuilt
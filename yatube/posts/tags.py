@@ -0,0 +1,128 @@
+"""Хэштеги и упоминания в тексте поста.
+
+При сохранении поста текст разбирается регулярными выражениями, а итог
+пишется в индексные таблицы: PostTag с датой поста (лента тега читается
+по индексу (tag, -pub_date, -post)) и Mention (упоминания пользователя —
+по индексу (user, -post)). Поиска LIKE по тексту нигде нет.
+"""
+import re
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+User = get_user_model()
+
+HASHTAG_RE = re.compile(r'(?<![\w#&/])#(\w{1,50})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]{1,150})')
+
+
+def hashtags(text):
+    return {name.lower() for name in HASHTAG_RE.findall(text)}
+
+
+def mentions(text):
+    return {name.rstrip('.') for name in MENTION_RE.findall(text)} - {''}
+
+
+def _tag_ids(names):
+    from .models import Tag
+
+    ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = names - ids.keys()
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in missing], ignore_conflicts=True
+        )
+        ids.update(
+            Tag.objects.filter(name__in=missing).values_list('name', 'id')
+        )
+    return ids
+
+
+def _delete_pairs(model, field, pairs):
+    by_post = defaultdict(list)
+    for post_id, value in pairs:
+        by_post[post_id].append(value)
+    for post_id, values in by_post.items():
+        model.objects.filter(
+            post_id=post_id, **{f'{field}__in': values}
+        ).delete()
+
+
+def index_posts(posts, fresh=False):
+    """Приводит теги и упоминания пачки постов в соответствие их текстам.
+
+    Пишутся только изменения. fresh=True — посты только что созданы,
+    и прежние связи не читаются. Возвращает созданные упоминания.
+    """
+    from .models import Mention, PostTag
+
+    posts = list(posts)
+    parsed = {
+        post.id: (hashtags(post.text), mentions(post.text)) for post in posts
+    }
+    names = set().union(*(tags for tags, _ in parsed.values()))
+    usernames = set().union(*(users for _, users in parsed.values()))
+    if fresh and not names and not usernames:
+        return []
+    ids = list(parsed)
+    tag_ids = _tag_ids(names) if names else {}
+    user_ids = dict(
+        User.objects.filter(username__in=usernames)
+        .values_list('username', 'id')
+    ) if usernames else {}
+    new_tags = {
+        (post.id, tag_ids[name])
+        for post in posts for name in parsed[post.id][0]
+    }
+    new_mentions = {
+        (post.id, user_ids[name])
+        for post in posts for name in parsed[post.id][1]
+        if name in user_ids and user_ids[name] != post.author_id
+    }
+    old_tags, old_mentions = set(), set()
+    if not fresh:
+        old_tags = set(
+            PostTag.objects.filter(post_id__in=ids)
+            .values_list('post_id', 'tag_id')
+        )
+        old_mentions = set(
+            Mention.objects.filter(post_id__in=ids)
+            .values_list('post_id', 'user_id')
+        )
+    dates = {post.id: post.pub_date for post in posts}
+    created = [
+        Mention(post_id=post_id, user_id=user_id)
+        for post_id, user_id in sorted(new_mentions - old_mentions)
+    ]
+    with transaction.atomic():
+        _delete_pairs(PostTag, 'tag_id', old_tags - new_tags)
+        _delete_pairs(Mention, 'user_id', old_mentions - new_mentions)
+        PostTag.objects.bulk_create(
+            [
+                PostTag(post_id=pk, tag_id=tag_id, pub_date=dates[pk])
+                for pk, tag_id in sorted(new_tags - old_tags)
+            ],
+            ignore_conflicts=True,
+        )
+        Mention.objects.bulk_create(created, ignore_conflicts=True)
+    return created
+
+
+def tag_posts(tag):
+    """Посты тега от новых к старым — поиск по индексу (tag, pub_date)."""
+    from .models import Post
+
+    return Post.objects.visible().filter(tag_links__tag=tag).order_by(
+        '-tag_links__pub_date', '-tag_links__post'
+    )
+
+
+def mentioned_posts(user):
+    """Посты, где упомянут user, от новых к старым — по индексу упоминаний."""
+    from .models import Post
+
+    return Post.objects.visible().filter(mentions__user=user).order_by(
+        '-mentions__post'
+    )
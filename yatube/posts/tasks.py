@@ -0,0 +1,29 @@
+"""Фоновые задачи постов (выполняет manage.py run_workers)."""
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from core import jobs
+from core.jobs import task
+from . import trending
+from .models import Post
+
+# Те же параметры, что у {% thumbnail %} в карточке и на странице поста.
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+@task
+def make_thumbnail(post_id):
+    """Готовит миниатюру заранее, чтобы Pillow не работал при показе ленты."""
+    post = Post.objects.filter(id=post_id).only('image').first()
+    if post is not None and post.image:
+        get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+
+@task
+def recompute_trending():
+    """Пересчитывает рейтинги и ставит следующий пересчёт по расписанию."""
+    trending.recompute()
+    jobs.enqueue(
+        recompute_trending, delay=settings.TRENDING_RECOMPUTE_INTERVAL
+    )
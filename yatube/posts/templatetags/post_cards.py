@@ -0,0 +1,20 @@
+from django import template
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts.cards import render_card
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    versions = context.render_context.setdefault('author_versions', {})
+    # Просмотры и реакции меняются чаще карточки, поэтому рисуются вне
+    # её кэша.
+    footer = render_to_string('includes/post_footer.html', {
+        'post': post,
+        'user': context.get('user'),
+        'csrf_token': context.get('csrf_token'),
+    })
+    return mark_safe(render_card(post, versions) + footer)
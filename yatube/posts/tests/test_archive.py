@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_posts, restore_posts
+from ..models import ArchivedComment, ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='archivist')
+        self.client = Client()
+        self.old_post = Post.objects.create(
+            author=self.user,
+            text='Старый пост',
+        )
+        self.old_date = timezone.now() - timedelta(days=400)
+        Post.objects.filter(id=self.old_post.id).update(
+            pub_date=self.old_date
+        )
+        Comment.objects.create(
+            post=self.old_post,
+            author=self.user,
+            text='Старый коммент',
+        )
+        self.new_post = Post.objects.create(
+            author=self.user,
+            text='Новый пост',
+        )
+
+    def test_archive_moves_old_posts_with_comments(self):
+        """Старые посты и их комментарии переезжают в архив."""
+        moved = archive_posts(batch_size=1)
+        self.assertEqual(moved, 1)
+        self.assertFalse(Post.objects.filter(id=self.old_post.id).exists())
+        self.assertTrue(Post.objects.filter(id=self.new_post.id).exists())
+        archived = ArchivedPost.objects.get(id=self.old_post.id)
+        self.assertEqual(archived.pub_date, self.old_date)
+        self.assertEqual(archived.comments.count(), 1)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_feeds_scan_hot_set_and_detail_falls_through(self):
+        """Лента показывает горячие посты, детальная страница — архив."""
+        archive_posts()
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.old_post.id,))
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(len(response.context['comments']), 1)
+
+    def test_profile_falls_through_to_archive(self):
+        """Профиль дополняет горячие посты архивными."""
+        archive_posts()
+        response = self.client.get(
+            reverse('posts:profile', args=(self.user.username,))
+        )
+        page = response.context['page_obj']
+        self.assertEqual(
+            [post.id for post in page],
+            [self.new_post.id, self.old_post.id]
+        )
+
+    def test_restore_returns_post_and_comments(self):
+        """Восстановление возвращает пост с исходной датой."""
+        archive_posts()
+        restored = restore_posts([self.old_post.id])
+        self.assertEqual(restored, 1)
+        post = Post.objects.get(id=self.old_post.id)
+        self.assertEqual(post.pub_date, self.old_date)
+        self.assertEqual(post.comments.count(), 1)
+        self.assertFalse(ArchivedPost.objects.exists())
+        self.assertFalse(ArchivedComment.objects.exists())
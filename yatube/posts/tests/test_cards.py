@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import cards
+from ..models import Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cards.stats.clear()
+        self.user = User.objects.create_user(
+            username='carder', first_name='Старое', last_name='Имя'
+        )
+        self.post = Post.objects.create(author=self.user, text='Карточка')
+        self.client = Client()
+
+    def get_profile(self):
+        return self.client.get(
+            reverse('posts:profile', args=(self.user.username,))
+        ).content.decode()
+
+    def test_feeds_share_cached_cards(self):
+        """Второй показ карточки в другой ленте берётся из кэша."""
+        self.get_profile()
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(cards.stats['misses'], 1)
+        self.assertEqual(cards.stats['hits'], 1)
+        self.assertEqual(cards.hit_rate(), 0.5)
+
+    def test_post_edit_invalidates_card(self):
+        self.get_profile()
+        self.post.text = 'Исправленная карточка'
+        self.post.save()
+        self.assertIn('Исправленная карточка', self.get_profile())
+
+    def test_author_name_change_invalidates_card(self):
+        self.assertIn('Старое Имя', self.get_profile())
+        self.user.first_name = 'Новое'
+        self.user.save()
+        self.assertIn('Новое Имя', self.get_profile())
+
+    def test_last_login_update_keeps_cards(self):
+        version = cards.author_version(self.user)
+        self.user.last_login = timezone.now()
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(
+            cards.author_version(User.objects.get(pk=self.user.pk)), version
+        )
+
+    def test_rename_in_another_process_invalidates_card(self):
+        self.get_profile()
+        # Сохранение в обход сигналов, как в чужом процессе.
+        User.objects.filter(pk=self.user.pk).update(first_name='Другое')
+        self.get_profile()
+        self.assertEqual(cards.stats['misses'], 2)
+        self.assertEqual(cards.stats['hits'], 0)
+
+    def test_stats_are_staff_only(self):
+        response = self.client.get(reverse('posts:card_cache_stats'))
+        self.assertEqual(response.status_code, 302)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('posts:card_cache_stats'))
+        self.assertEqual(set(response.json()), {'hits', 'misses', 'hit_rate'})
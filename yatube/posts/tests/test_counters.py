@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..counters import ViewBuffer, buffer
+from ..models import Post
+
+User = get_user_model()
+
+
+@override_settings(VIEW_FLUSH_INTERVAL=3600, VIEW_FLUSH_THRESHOLD=1000)
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {number}')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        buffer.take()
+
+    def tearDown(self):
+        buffer.take()
+
+    def test_views_are_buffered_until_flush(self):
+        views = ViewBuffer()
+        for post in (self.posts[0], self.posts[0], self.posts[1]):
+            views.record(post.id)
+        self.assertEqual(Post.objects.get(id=self.posts[0].id).views, 0)
+        with self.assertNumQueries(1):
+            self.assertEqual(views.flush(), 2)
+        self.assertEqual(
+            [post.views for post in Post.objects.order_by('id')], [2, 1, 0]
+        )
+
+    @override_settings(VIEW_FLUSH_BATCH_SIZE=1)
+    def test_flush_splits_into_batches(self):
+        views = ViewBuffer()
+        for post in self.posts:
+            views.record(post.id)
+        with self.assertNumQueries(3):
+            views.flush()
+
+    @override_settings(VIEW_FLUSH_THRESHOLD=2)
+    def test_threshold_triggers_flush(self):
+        views = ViewBuffer()
+        views.record(self.posts[2].id)
+        views.record(self.posts[2].id)
+        self.assertEqual(Post.objects.get(id=self.posts[2].id).views, 2)
+        self.assertEqual(views.pending, {})
+
+    def test_post_detail_counts_views_and_card_shows_them(self):
+        client = Client()
+        post = self.posts[0]
+        client.get(reverse('posts:post_detail', args=(post.id,)))
+        buffer.flush()
+        response = client.get(reverse('posts:profile', args=('reader',)))
+        self.assertContains(response, 'Просмотров: 1')
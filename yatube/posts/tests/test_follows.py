@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..follows import follow, unfollow
+from ..models import Follow
+
+User = get_user_model()
+
+
+class FollowServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+
+    def test_follow_is_single_insert_and_idempotent(self):
+        with self.assertNumQueries(3):
+            self.assertTrue(follow(self.reader, self.author))
+        self.assertFalse(follow(self.reader, self.author))
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_cant_follow_yourself(self):
+        self.assertFalse(follow(self.reader, self.reader))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_unfollow_is_single_delete(self):
+        follow(self.reader, self.author)
+        with self.assertNumQueries(1):
+            self.assertTrue(unfollow(self.reader, self.author))
+        self.assertFalse(unfollow(self.reader, self.author))
+
+
+class FollowViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_follow_missing_user_is_404(self):
+        response = self.client.get(
+            reverse('posts:profile_follow', args=('nobody',))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_json_follow_and_unfollow(self):
+        """JSON-варианты возвращают состояние подписки и число читателей."""
+        url = reverse('posts:profile_follow_json', args=('author',))
+        self.assertEqual(self.client.get(url).status_code, 405)
+        response = self.client.post(url)
+        self.assertEqual(response.json(), {'following': True, 'followers': 1})
+        response = self.client.post(
+            reverse('posts:profile_unfollow_json', args=('author',))
+        )
+        self.assertEqual(
+            response.json(), {'following': False, 'followers': 0}
+        )
@@ -0,0 +1,76 @@
+from array import array
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .. import graph
+from ..follows import unfollow
+from ..models import Follow, Post
+from ..views import followed_posts
+
+User = get_user_model()
+
+
+class FollowGraphTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ann, self.bob, self.eve = (
+            User.objects.create_user(username=name)
+            for name in ('ann', 'bob', 'eve')
+        )
+        Follow.objects.create(user=self.ann, author=self.bob)
+        Follow.objects.create(user=self.bob, author=self.ann)
+        Follow.objects.create(user=self.ann, author=self.eve)
+
+    def test_arrays_are_sorted_and_loaded_once(self):
+        expected = sorted([self.bob.id, self.eve.id])
+        self.assertEqual(list(graph.followings(self.ann.id)), expected)
+        graph.followings(self.eve.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(graph.is_following(self.ann.id, self.eve.id))
+            self.assertFalse(graph.is_following(self.eve.id, self.ann.id))
+
+    def test_mutual_follows(self):
+        self.assertEqual(graph.mutual_follows(self.ann.id), [self.bob.id])
+
+    def test_changes_reset_cached_arrays(self):
+        for user in (self.ann, self.eve):
+            graph.followings(user.id)
+            graph.followers(user.id)
+        Follow.objects.create(user=self.eve, author=self.ann)
+        with self.assertNumQueries(1):
+            self.assertTrue(graph.is_following(self.eve.id, self.ann.id))
+        self.assertIn(self.eve.id, graph.followers(self.ann.id))
+        unfollow(self.eve, self.ann)
+        Follow.objects.get(user=self.ann, author=self.bob).delete()
+        self.assertFalse(graph.is_following(self.eve.id, self.ann.id))
+        self.assertNotIn(self.eve.id, graph.followers(self.ann.id))
+        self.assertEqual(list(graph.followings(self.ann.id)), [self.eve.id])
+
+    @override_settings(FOLLOW_GRAPH_IN_LIMIT=1)
+    def test_followed_posts_from_graph(self):
+        Post.objects.create(author=self.bob, text='Боб')
+        Post.objects.create(author=self.eve, text='Ева')
+        Post.objects.create(author=self.ann, text='Энн')
+        expected = ['Боб', 'Ева']
+        self.assertEqual(sorted(
+            post.text for post in followed_posts(self.ann)
+        ), expected)
+        graph.followings(self.bob.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [post.text for post in followed_posts(self.bob)], ['Энн']
+            )
+
+
+class FollowGraphCommitTests(TransactionTestCase):
+    def test_arrays_read_before_commit_are_reset(self):
+        ann = User.objects.create_user(username='ann')
+        bob = User.objects.create_user(username='bob')
+        with transaction.atomic():
+            Follow.objects.create(user=ann, author=bob)
+            # Массив, прочитанный другим запросом до коммита.
+            graph._set(graph.FOLLOWINGS, ann.id, array('I'))
+        self.assertEqual(list(graph.followings(ann.id)), [bob.id])
@@ -0,0 +1,82 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..live import Notifier
+from ..models import Post
+
+User = get_user_model()
+
+
+class NotifierTests(SimpleTestCase):
+    def test_notify_wakes_waiter_before_timeout(self):
+        notifier = Notifier()
+        started = time.monotonic()
+        threading.Timer(0.05, notifier.notify).start()
+        notifier.wait(notifier.version, timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(notifier.version, 1)
+
+
+class NewPostsViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='poller')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_long_poll_reports_new_posts(self):
+        since = (self.post.pub_date - timedelta(seconds=1)).isoformat()
+        response = self.client.get(
+            reverse('posts:new_posts'), {'since': since}
+        )
+        self.assertEqual(response.json()['new'], 1)
+
+    def test_naive_since_is_read_in_current_timezone(self):
+        response = self.client.get(
+            reverse('posts:new_posts'), {'since': '2020-01-01T00:00:00'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['new'], 1)
+
+    @override_settings(LIVE_POLL_INTERVAL=0.01)
+    def test_long_poll_times_out_without_new_posts(self):
+        response = self.client.get(
+            reverse('posts:new_posts'),
+            {'since': self.post.pub_date.isoformat(), 'wait': 0.05},
+        )
+        self.assertEqual(response.json()['new'], 0)
+
+    def test_bad_wait_is_rejected(self):
+        for wait in ('nan', 'inf', '-inf', 'abc'):
+            with self.subTest(wait=wait):
+                response = self.client.get(
+                    reverse('posts:new_posts'), {'wait': wait}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_negative_wait_does_not_wait(self):
+        response = self.client.get(
+            reverse('posts:new_posts'),
+            {'since': self.post.pub_date.isoformat(), 'wait': -1},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['new'], 0)
+
+    def test_follow_scope_requires_login(self):
+        response = self.client.get(reverse('posts:new_posts'), {'follow': 1})
+        self.assertEqual(response.status_code, 401)
+
+    def test_server_sent_events(self):
+        response = self.client.get(
+            reverse('posts:new_posts'), HTTP_ACCEPT='text/event-stream'
+        )
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('event: posts', body)
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import Page
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..merge_feed import MergeFeed
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class MergeFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        now = timezone.now()
+        minute = 0
+        for number in range(4):
+            author = User.objects.create_user(username=f'author{number}')
+            Follow.objects.create(user=cls.reader, author=author)
+            for _ in range(number * 3 + 1):
+                post = Post.objects.create(author=author, text='Пост')
+                minute += 7
+                Post.objects.filter(id=post.id).update(
+                    pub_date=now - timedelta(minutes=minute % 31)
+                )
+        stranger = User.objects.create_user(username='stranger')
+        Post.objects.create(author=stranger, text='Чужой пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def expected_ids(self):
+        return list(
+            Post.objects.filter(author__following__user=self.reader)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+
+    def test_pages_match_join_order(self):
+        """Слияние выдаёт те же посты и в том же порядке, что и JOIN."""
+        feed = MergeFeed(self.reader)
+        self.assertEqual(feed.count(), 22)
+        ids = []
+        for start in range(0, 22, 5):
+            ids.extend(post.id for post in feed[start:start + 5])
+        self.assertEqual(ids, self.expected_ids())
+
+    def test_next_page_resumes_from_cached_cursors(self):
+        MergeFeed(self.reader)[0:10]
+        feed = MergeFeed(self.reader)
+        feed.count()
+        with CaptureQueriesContext(connection) as queries:
+            second = [post.id for post in feed[10:20]]
+        self.assertFalse(
+            any('MAX(' in query['sql'] for query in queries.captured_queries)
+        )
+        self.assertEqual(second, self.expected_ids()[10:20])
+
+    def test_cold_jump_to_far_page(self):
+        feed = MergeFeed(self.reader)
+        ids = [post.id for post in feed[20:30]]
+        self.assertEqual(ids, self.expected_ids()[20:])
+
+    @override_settings(FOLLOW_FEED_ENGINE='merge')
+    def test_follow_index_uses_merge_engine(self):
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:follow_index') + '?page=3')
+        page = response.context['page_obj']
+        self.assertEqual(type(page), Page)
+        self.assertEqual(
+            [post.id for post in page], self.expected_ids()[20:]
+        )
+
+    @override_settings(FOLLOW_FEED_ENGINE='merge')
+    def test_merge_engine_hides_deactivated_authors(self):
+        User.objects.filter(username='author3').update(is_active=False)
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:follow_index'))
+        page = response.context['page_obj']
+        self.assertEqual(page.paginator.count, 12)
+        self.assertEqual(
+            [post.id for post in page],
+            list(
+                Post.objects.visible()
+                .filter(author__following__user=self.reader)
+                .order_by('-pub_date', '-id')
+                .values_list('id', flat=True)[:10]
+            ),
+        )
@@ -0,0 +1,132 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .. import notifications
+from ..follows import follow
+from ..models import Comment, Follow, Notification, Post
+
+User = get_user_model()
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.other = User.objects.create_user(username='other')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_comment_and_reply_fan_out(self):
+        root = Comment.objects.create(
+            post=self.post, author=self.reader, text='Вопрос'
+        )
+        reply = Comment.objects.create(
+            post=self.post, author=self.other, text='Ответ', parent=root
+        )
+        with self.assertNumQueries(2):
+            delivered = notifications.commented(reply)
+        self.assertEqual(
+            sorted((row.recipient_id, row.kind) for row in delivered),
+            [
+                (self.author.id, Notification.COMMENT),
+                (self.reader.id, Notification.REPLY),
+            ],
+        )
+        own = Comment.objects.create(
+            post=self.post, author=self.author, text='Сам себе'
+        )
+        self.assertEqual(notifications.commented(own), [])
+
+    def test_mentions_delivered_in_one_insert(self):
+        post = Post.objects.create(
+            author=self.author, text='Привет @reader и @other'
+        )
+        mentions = list(post.mentions.all())
+        with self.assertNumQueries(1):
+            notifications.mentioned(post, mentions)
+        self.assertEqual(
+            Notification.objects.filter(kind=Notification.MENTION).count(),
+            2,
+        )
+
+    def test_unread_counter_is_cached(self):
+        notifications.followed(Follow(user=self.reader, author=self.author))
+        with self.assertNumQueries(1):
+            self.assertEqual(notifications.unread_count(self.author), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(notifications.unread_count(self.author), 1)
+        notifications.followed(Follow(user=self.other, author=self.author))
+        with self.assertNumQueries(1):
+            self.assertEqual(notifications.unread_count(self.author), 2)
+        notifications.mark_read(self.author)
+        with self.assertNumQueries(1):
+            self.assertEqual(notifications.unread_count(self.author), 0)
+
+    def test_unread_counter_skips_inactive_actors(self):
+        for user in (self.reader, self.other):
+            notifications.followed(Follow(user=user, author=self.author))
+        User.objects.filter(id=self.other.id).update(is_active=False)
+        self.assertEqual(notifications.unread_count(self.author), 1)
+        rows, _ = notifications.inbox_page(self.author)
+        self.assertEqual([row.actor for row in rows], [self.reader])
+
+    def test_header_badge_and_inbox(self):
+        for user in (self.reader, self.other):
+            notifications.followed(Follow(user=user, author=self.author))
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['notifications_unread'], 2)
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertEqual(
+            [row.actor for row in response.context['notifications']],
+            [self.other, self.reader],
+        )
+        self.assertEqual(notifications.unread_count(self.author), 0)
+
+    def test_inbox_cursor(self):
+        for number in range(5):
+            user = User.objects.create_user(username=f'fan{number}')
+            notifications.followed(Follow(user=user, author=self.author))
+        rows, cursor = notifications.inbox_page(self.author, size=2)
+        seen = [row.id for row in rows]
+        while cursor:
+            rows, cursor = notifications.inbox_page(
+                self.author, before=cursor, size=2
+            )
+            seen += [row.id for row in rows]
+        self.assertEqual(
+            seen,
+            list(Notification.objects.order_by('-id')
+                 .values_list('id', flat=True)),
+        )
+        response = self.client.get(
+            reverse('posts:notifications'), {'before': 'x'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class NotificationWiringTests(TransactionTestCase):
+    def test_events_notify_after_commit(self):
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        follow(reader, author)
+        post = Post.objects.create(author=author, text='Для @reader')
+        client = Client()
+        client.force_login(reader)
+        client.post(
+            reverse('posts:add_comment', args=[post.id]), {'text': 'Спасибо'}
+        )
+        self.assertEqual(
+            sorted(Notification.objects.values_list('recipient', 'kind')),
+            [
+                (author.id, Notification.COMMENT),
+                (author.id, Notification.FOLLOW),
+                (reader.id, Notification.MENTION),
+            ],
+        )
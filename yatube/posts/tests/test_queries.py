@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from ..models import Group, Post
+from ..queries import feed_queryset, feed_rows, page_memory_report
+
+User = get_user_model()
+
+
+class FeedQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='lean', first_name='Иван', last_name='Петров'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='lean-group', description='Описание'
+        )
+        for number in range(3):
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Пост {number}',
+            )
+
+    def test_feed_queryset_renders_card_without_extra_queries(self):
+        """Автор и группа приходят одним запросом."""
+        with self.assertNumQueries(1):
+            for post in feed_queryset(Post.objects.all()):
+                post.author.get_full_name()
+                post.group.slug
+        post = feed_queryset(Post.objects.all())[0]
+        self.assertIn('password', post.author.get_deferred_fields())
+
+    def test_feed_rows_are_compact(self):
+        rows = feed_rows(Post.objects.all())
+        self.assertEqual(len(rows), 3)
+        row = rows[0]
+        self.assertFalse(hasattr(row, '__dict__'))
+        self.assertEqual(row.author.get_full_name(), 'Иван Петров')
+        self.assertEqual(str(row.author), 'lean')
+        self.assertEqual(row.group.slug, 'lean-group')
+
+    def test_memory_report_has_all_projections(self):
+        report = page_memory_report(Post.objects.all(), 3)
+        self.assertEqual(set(report), {'full', 'only', 'rows'})
+        self.assertLess(report['rows'], report['full'])
@@ -0,0 +1,138 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import reactions
+from ..archive import archive_posts, restore_posts
+from ..models import Comment, Post, Reaction, ReactionCounter
+
+User = get_user_model()
+
+
+class ReactionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.readers = [
+            User.objects.create_user(username=f'reader{number}')
+            for number in range(5)
+        ]
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        cls.comment = Comment.objects.create(
+            post=cls.posts[0], author=cls.author, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.readers[0])
+
+    def totals(self, target):
+        return reactions.counts([reactions.target_key(target)]).get(
+            reactions.target_key(target), {}
+        )
+
+    def test_unique_reaction_per_target(self):
+        Reaction.objects.create(
+            user=self.readers[0], post=self.posts[0], kind='like'
+        )
+        with self.assertRaises(IntegrityError):
+            Reaction.objects.create(
+                user=self.readers[0], post=self.posts[0], kind='sad'
+            )
+
+    def test_react_change_and_unreact(self):
+        post = self.posts[0]
+        for reader in self.readers:
+            self.assertTrue(reactions.react(reader, post, 'like'))
+        self.assertFalse(reactions.react(self.readers[0], post, 'like'))
+        self.assertEqual(self.totals(post), {'like': 5})
+        reactions.react(self.readers[0], post, 'heart')
+        self.assertEqual(self.totals(post), {'like': 4, 'heart': 1})
+        self.assertTrue(reactions.unreact(self.readers[1], post))
+        self.assertFalse(reactions.unreact(self.readers[1], post))
+        self.assertEqual(self.totals(post), {'like': 3, 'heart': 1})
+        self.assertEqual(Reaction.objects.filter(post=post).count(), 4)
+
+    @override_settings(REACTION_COUNTER_SHARDS=4)
+    def test_counts_spread_over_shards(self):
+        post = self.posts[0]
+        users = [
+            User.objects.create_user(username=f'fan{number}')
+            for number in range(40)
+        ]
+        for user in users:
+            reactions.react(user, post, 'like')
+        shards = ReactionCounter.objects.filter(
+            target=reactions.target_key(post)
+        )
+        self.assertGreater(shards.count(), 1)
+        self.assertLessEqual(shards.count(), 4)
+        self.assertEqual(self.totals(post), {'like': 40})
+
+    def test_attach_reads_viewer_state_in_one_query(self):
+        reactions.react(self.readers[0], self.posts[1], 'laugh')
+        reactions.react(self.readers[1], self.posts[2], 'like')
+        with self.assertNumQueries(2):
+            posts = reactions.attach(self.posts, self.readers[0])
+        self.assertEqual(
+            [post.my_reaction for post in posts], [None, 'laugh', None]
+        )
+        self.assertEqual(dict(
+            (kind, count) for kind, _, count in posts[2].reaction_counts
+        )['like'], 1)
+        with self.assertNumQueries(1):
+            reactions.attach(self.posts, AnonymousUser())
+
+    def test_post_react_view(self):
+        url = reverse('posts:post_react', args=[self.posts[0].id])
+        response = self.client.post(
+            url, {'kind': 'heart'}, HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.json()['reaction'], 'heart')
+        self.assertEqual(response.json()['counts']['heart'], 1)
+        response = self.client.post(url, {'kind': ''})
+        self.assertRedirects(
+            response,
+            reverse('posts:post_detail', args=[self.posts[0].id]),
+        )
+        self.assertFalse(Reaction.objects.exists())
+        response = self.client.post(url, {'kind': 'nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    def test_comment_react_view(self):
+        response = self.client.post(
+            reverse('posts:comment_react', args=[self.comment.id]),
+            {'kind': 'like'},
+            HTTP_ACCEPT='application/json',
+        )
+        self.assertEqual(response.json()['counts']['like'], 1)
+        self.assertTrue(
+            Reaction.objects.filter(comment=self.comment).exists()
+        )
+
+    def test_feed_marks_own_reaction(self):
+        reactions.react(self.readers[0], self.posts[2], 'sad')
+        response = self.client.get(reverse('posts:index'))
+        page = response.context['page_obj']
+        self.assertEqual(page[0].my_reaction, 'sad')
+        self.assertContains(response, 'btn-primary', count=1)
+
+    def test_archived_post_keeps_frozen_counts(self):
+        post = self.posts[0]
+        reactions.react(self.readers[0], post, 'like')
+        reactions.react(self.readers[1], self.comment, 'like')
+        Post.objects.filter(id=post.id).update(pub_date='2000-01-01 00:00Z')
+        archive_posts(cutoff=self.posts[1].pub_date)
+        self.assertFalse(Reaction.objects.exists())
+        self.assertEqual(self.totals(post), {'like': 1})
+        self.assertEqual(self.totals(self.comment), {})
+        restore_posts([post.id])
+        self.assertEqual(self.totals(post), {})
@@ -0,0 +1,73 @@
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .. import follows, recommend
+from ..models import Follow, FollowSuggestion
+
+User = get_user_model()
+
+
+class FollowMatrixTests(SimpleTestCase):
+    def test_friends_of_friends_ranked_by_paths(self):
+        # 1 читает 2 и 3; 2 и 3 читают 4; 3 читает 5; 1 уже читает 2.
+        matrix = recommend.FollowMatrix(
+            [1, 1, 2, 3, 3, 2], [2, 3, 4, 4, 5, 3]
+        )
+        rows = np.searchsorted(matrix.ids, [1])
+        users, authors, scores, ranks = matrix.suggest(rows, top_k=5)
+        self.assertEqual(users.tolist(), [1, 1])
+        self.assertEqual(authors.tolist(), [4, 5])
+        self.assertEqual(ranks.tolist(), [0, 1])
+        self.assertGreater(scores[0], scores[1])
+
+    def test_top_k_is_per_user(self):
+        matrix = recommend.FollowMatrix(
+            [1, 2, 2, 2, 3, 3, 3], [2, 4, 5, 6, 4, 5, 6]
+        )
+        rows = np.searchsorted(matrix.ids, [1, 3])
+        users, authors, _, _ = matrix.suggest(rows, top_k=2)
+        self.assertEqual(users.tolist(), [1, 1])
+
+
+class RecommendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(username=f'user{number}')
+            for number in range(5)
+        ]
+        first, second, third, fourth, _ = self.users
+        for user, author in ((first, second), (second, third),
+                             (second, fourth), (fourth, third)):
+            Follow.objects.create(user=user, author=author)
+
+    def test_recompute_stores_suggestions_and_popular(self):
+        self.assertGreater(recommend.recompute(), 0)
+        first, _, third, fourth, newcomer = self.users
+        self.assertEqual(
+            recommend.suggestions(first), [third, fourth]
+        )
+        self.assertEqual(recommend.suggestions(newcomer)[0], third)
+        recommend.recompute()
+        self.assertEqual(
+            FollowSuggestion.objects.filter(user=first).count(), 2
+        )
+
+    def test_follow_removes_suggestion(self):
+        recommend.recompute()
+        first, _, third, fourth, _ = self.users
+        follows.follow(first, third)
+        self.assertEqual(recommend.suggestions(first), [fourth])
+
+    def test_follow_index_shows_suggestions(self):
+        recommend.recompute()
+        client = Client()
+        client.force_login(self.users[0])
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            response.context['suggestions'], [self.users[2], self.users[3]]
+        )
+        self.assertContains(response, 'Кого почитать')
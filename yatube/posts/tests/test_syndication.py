@@ -0,0 +1,135 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import syndication
+from ..models import Group, Post
+
+User = get_user_model()
+
+CACHE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(FEEDS_CACHE_DIR=CACHE_DIR, SITEMAP_SEGMENT_SIZE=2)
+class SyndicationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {index}'
+            )
+            for index in range(3)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        self.client = Client()
+
+    def test_feeds_list_posts_of_their_scope(self):
+        urls = (
+            reverse('posts:posts_rss'),
+            reverse('posts:posts_atom'),
+            reverse('posts:group_rss', args=(self.group.slug,)),
+            reverse('posts:group_atom', args=(self.group.slug,)),
+            reverse('posts:profile_rss', args=(self.user.username,)),
+            reverse('posts:profile_atom', args=(self.user.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Пост 2')
+
+    def test_feed_is_cached_until_scope_changes(self):
+        url = reverse('posts:posts_rss')
+        with mock.patch.object(
+            syndication.LatestPostsFeed, '__call__', autospec=True,
+            side_effect=Feed.__call__,
+        ) as build:
+            self.client.get(url)
+            self.client.get(url)
+            self.assertEqual(build.call_count, 1)
+            Post.objects.create(author=self.user, text='Новый')
+            self.assertContains(self.client.get(url), 'Новый')
+            self.assertEqual(build.call_count, 2)
+
+    def test_feed_answers_not_modified_on_matching_etag(self):
+        url = reverse('posts:posts_atom')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_sitemap_index_lists_segments(self):
+        response = self.client.get(reverse('posts:sitemap_index'))
+        post_segments = {post.id // 2 for post in self.posts}
+        for segment in post_segments:
+            self.assertContains(
+                response,
+                reverse('posts:sitemap_segment', args=('posts', segment)),
+            )
+        self.assertContains(
+            response,
+            reverse(
+                'posts:sitemap_segment', args=('profiles', self.user.id // 2)
+            ),
+        )
+
+    def test_segment_contains_urls(self):
+        post = self.posts[0]
+        response = self.client.get(
+            reverse('posts:sitemap_segment', args=('posts', post.id // 2))
+        )
+        self.assertContains(
+            response, reverse('posts:post_detail', args=(post.id,))
+        )
+        response = self.client.get(
+            reverse('posts:sitemap_segment', args=('profiles', 99))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_rebuild_rewrites_only_changed_segments(self):
+        segments = len(syndication.post_segments()) + len(
+            syndication.profile_segments()
+        )
+        self.assertEqual(syndication.rebuild_sitemaps(), segments)
+        self.assertEqual(syndication.rebuild_sitemaps(), 0)
+        post = self.posts[-1]
+        post.text = 'Правка'
+        post.save()
+        # Меняется сегмент поста и сегмент профиля его автора.
+        self.assertEqual(syndication.rebuild_sitemaps(), 2)
+
+    def test_segment_reads_only_its_range(self):
+        post = self.posts[0]
+        url = reverse('posts:sitemap_segment', args=('posts', post.id // 2))
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('GROUP BY', queries.captured_queries[0]['sql'])
+
+    def test_sitemap_index_is_cached_on_disk(self):
+        url = reverse('posts:sitemap_index')
+        first = self.client.get(url).content
+        with mock.patch.object(syndication, 'build_index') as build:
+            self.assertEqual(self.client.get(url).content, first)
+        build.assert_not_called()
+        post = Post.objects.create(author=self.user, text='Новый')
+        self.assertContains(
+            self.client.get(url),
+            reverse('posts:sitemap_segment', args=('posts', post.id // 2)),
+        )
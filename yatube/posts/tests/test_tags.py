@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import tags
+from ..models import Mention, Post, PostTag, Tag
+
+User = get_user_model()
+
+CACHE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(FEEDS_CACHE_DIR=CACHE_DIR)
+class TagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='writer')
+        cls.reader = User.objects.create_user(username='reader.one')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        cache.clear()
+
+    def test_parsing(self):
+        text = (
+            '#Django и #django, адрес site.ru/#anchor, почта a@b.c, '
+            '@reader.one.'
+        )
+        self.assertEqual(tags.hashtags(text), {'django'})
+        self.assertEqual(tags.mentions(text), {'reader.one'})
+
+    def test_save_indexes_tags_and_mentions(self):
+        post = Post.objects.create(
+            author=self.author, text='Привет @reader.one #новости #Python'
+        )
+        self.assertEqual(
+            set(Tag.objects.filter(post_links__post=post)
+                .values_list('name', flat=True)),
+            {'новости', 'python'},
+        )
+        self.assertEqual(
+            list(Mention.objects.values_list('post', 'user')),
+            [(post.id, self.reader.id)],
+        )
+        self.assertEqual(
+            PostTag.objects.filter(post=post).first().pub_date,
+            post.pub_date,
+        )
+        post.text = 'Только #python, @writer себя не упоминает'
+        post.save()
+        self.assertEqual(
+            list(PostTag.objects.values_list('tag__name', flat=True)),
+            ['python'],
+        )
+        self.assertFalse(Mention.objects.exists())
+        self.assertEqual(list(tags.mentioned_posts(self.reader)), [])
+
+    def test_plain_post_costs_no_extra_queries(self):
+        with self.assertNumQueries(1):
+            Post.objects.create(author=self.author, text='Без тегов')
+
+    def test_tag_feed_newest_first(self):
+        posts = [
+            Post.objects.create(author=self.author, text=f'#лента {number}')
+            for number in range(3)
+        ]
+        Post.objects.create(author=self.author, text='#другое')
+        response = Client().get(reverse('posts:tag', args=['Лента']))
+        self.assertEqual(
+            list(response.context['page_obj']), posts[::-1]
+        )
+        response = Client().get(reverse('posts:tag_rss', args=['лента']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Client().get(reverse('posts:tag', args=['нет'])).status_code,
+            404,
+        )
+
+    def test_backfill_indexes_existing_posts(self):
+        post = Post.objects.create(author=self.author, text='Старый')
+        Post.objects.filter(id=post.id).update(text='Старый #архив')
+        call_command('backfill_post_tags', pause=0, stdout=StringIO())
+        self.assertTrue(
+            PostTag.objects.filter(post=post, tag__name='архив').exists()
+        )
@@ -0,0 +1,44 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Post
+
+User = get_user_model()
+
+
+@override_settings(POST_EXCERPT_LENGTH=40, POST_LINKIFY=True)
+class PostTextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+
+    def test_save_fills_excerpt_and_html(self):
+        """Выдержка и HTML считаются при сохранении поста."""
+        post = Post.objects.create(
+            author=self.user,
+            text='<b>Первый</b>\n\nсм. https://example.com ' + 'x' * 50,
+        )
+        self.assertEqual(len(post.excerpt), 40)
+        self.assertTrue(post.excerpt.endswith('…'))
+        self.assertIn('&lt;b&gt;Первый&lt;/b&gt;', post.text_html)
+        self.assertIn('<a href="https://example.com"', post.text_html)
+        self.assertEqual(post.text_html.count('<p>'), 2)
+
+    def test_update_fields_with_text_refreshes_columns(self):
+        post = Post.objects.create(author=self.user, text='Старый')
+        post.text = 'Новый'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Новый')
+        self.assertEqual(post.text_html, '<p>Новый</p>')
+
+    def test_backfill_command_fills_existing_rows(self):
+        post = Post.objects.create(author=self.user, text='Пост')
+        Post.objects.update(excerpt='', text_html='')
+        call_command('backfill_post_text', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Пост')
+        self.assertEqual(post.text_html, '<p>Пост</p>')
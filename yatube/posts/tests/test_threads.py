@@ -0,0 +1,151 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import threads
+from ..archive import archive_posts, restore_posts
+from ..models import ArchivedComment, Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENT_REPLIES_SHOWN=2, COMMENT_MAX_DEPTH=2)
+class CommentThreadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='talker')
+        cls.post = Post.objects.create(author=cls.user, text='Обсуждение')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(
+            post=self.post, author=self.user, text=text, parent=parent
+        )
+
+    def test_path_follows_ancestors(self):
+        root = self.comment('корень')
+        reply = self.comment('ответ', root)
+        deep = self.comment('глубже', reply)
+        self.assertEqual(root.path, threads.segment(root.id))
+        self.assertEqual(reply.path, root.path + threads.segment(reply.id))
+        self.assertEqual(deep.depth, 2)
+        self.assertEqual(
+            Comment.objects.get(id=deep.id).path,
+            reply.path + threads.segment(deep.id),
+        )
+
+    def test_replies_beyond_max_depth_become_siblings(self):
+        root = self.comment('корень')
+        reply = self.comment('ответ', root)
+        deep = self.comment('глубже', reply)
+        deeper = self.comment('ещё глубже', deep)
+        self.assertEqual(deeper.depth, 2)
+        self.assertEqual(deeper.parent_id, reply.id)
+        self.assertEqual(deeper.path, reply.path + threads.segment(deeper.id))
+
+    def test_subtree_is_a_range(self):
+        first = self.comment('первый')
+        reply = self.comment('ответ', first)
+        second = self.comment('второй')
+        self.comment('ответ на ответ', reply)
+        self.assertEqual(
+            [comment.text for comment in threads.subtree(
+                Comment.objects.all(), first.path
+            )],
+            ['первый', 'ответ', 'ответ на ответ'],
+        )
+        self.assertEqual(
+            list(threads.subtree(Comment.objects.all(), second.path)),
+            [second],
+        )
+
+    def test_top_threads_in_one_query(self):
+        roots = [self.comment(f'ветка {number}') for number in range(3)]
+        for root in roots:
+            for number in range(3):
+                self.comment(f'ответ {number}', root)
+        with self.assertNumQueries(1):
+            comments, after = threads.top_threads(
+                self.post.comments.all(), limit=2
+            )
+        self.assertEqual(len(comments), 8)
+        self.assertEqual(after, roots[1].id)
+        self.assertEqual(
+            [comment.fold_start for comment in comments],
+            [0, 0, 0, 1, 0, 0, 0, 1],
+        )
+        self.assertTrue(comments[3].fold_end)
+        comments, after = threads.top_threads(
+            self.post.comments.all(), limit=2, after=after
+        )
+        self.assertEqual([comment.text for comment in comments[:1]], [
+            'ветка 2'
+        ])
+        self.assertIsNone(after)
+
+    def test_no_cursor_when_threads_fit(self):
+        for number in range(2):
+            self.comment(f'ветка {number}')
+        comments, after = threads.top_threads(
+            self.post.comments.all(), limit=2
+        )
+        self.assertEqual(len(comments), 2)
+        self.assertIsNone(after)
+
+    def test_reply_view_and_page(self):
+        root = self.comment('корень')
+        self.client.post(
+            reverse('posts:add_comment', args=[self.post.id]),
+            {'text': 'ответ', 'parent': root.id},
+        )
+        reply = Comment.objects.get(text='ответ')
+        self.assertEqual(reply.parent, root)
+        for number in range(3):
+            self.comment(f'ещё {number}', root)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        self.assertContains(response, 'Показать ещё ответов: 2')
+        self.assertEqual(
+            self.client.get(
+                reverse('posts:post_detail', args=[self.post.id]),
+                {'after': 'x'},
+            ).status_code,
+            400,
+        )
+
+    def test_archive_keeps_threads(self):
+        root = self.comment('корень')
+        reply = self.comment('ответ', root)
+        Post.objects.filter(id=self.post.id).update(
+            pub_date='2000-01-01 00:00Z'
+        )
+        archive_posts(cutoff=root.created)
+        archived = ArchivedComment.objects.get(id=reply.id)
+        self.assertEqual(archived.path, reply.path)
+        self.assertEqual(archived.parent_id, root.id)
+        restore_posts([self.post.id])
+        self.assertEqual(Comment.objects.get(id=reply.id).parent, root)
+
+    def test_comments_without_path_are_shown(self):
+        legacy = [self.comment(f'старый {number}') for number in range(3)]
+        Comment.objects.filter(
+            id__in=[comment.id for comment in legacy]
+        ).update(path='')
+        comments, _ = threads.top_threads(self.post.comments.all(), limit=2)
+        self.assertEqual(len(comments), 3)
+
+    def test_backfill_sets_root_paths(self):
+        comment = self.comment('старый')
+        Comment.objects.filter(id=comment.id).update(path='')
+        call_command('backfill_comment_paths', pause=0, stdout=StringIO())
+        self.assertEqual(
+            Comment.objects.get(id=comment.id).path,
+            threads.segment(comment.id),
+        )
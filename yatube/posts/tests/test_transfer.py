@@ -0,0 +1,125 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_posts
+from ..models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Group, Post
+)
+from ..transfer import export_lines, import_lines
+
+User = get_user_model()
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Старый пост'
+        )
+        cls.pub_date = timezone.now() - timedelta(days=30)
+        Post.objects.filter(id=cls.post.id).update(pub_date=cls.pub_date)
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_round_trip_keeps_rows_and_dates(self):
+        lines = list(export_lines(chunk_size=1))
+        self.assertEqual(
+            [json.loads(line)['model'] for line in lines],
+            ['group', 'post', 'comment', 'follow'],
+        )
+        Group.objects.all().delete()
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        counts = import_lines(lines, batch_size=1)
+        self.assertEqual(counts, {
+            'group': 1, 'post': 1, 'comment': 1, 'archived_post': 0,
+            'archived_comment': 0, 'follow': 1,
+        })
+        post = Post.objects.get(id=self.post.id)
+        self.assertEqual(post.pub_date, self.pub_date)
+        self.assertEqual(post.group, self.group)
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+
+    def test_round_trip_keeps_archived_rows(self):
+        archive_posts(cutoff=timezone.now() - timedelta(days=1))
+        archived = ArchivedPost.objects.get(id=self.post.id)
+        lines = list(export_lines())
+        self.assertEqual(
+            [json.loads(line)['model'] for line in lines],
+            ['group', 'archived_post', 'archived_comment', 'follow'],
+        )
+        ArchivedPost.objects.all().delete()
+        counts = import_lines(lines)
+        self.assertEqual(counts['archived_post'], 1)
+        self.assertEqual(counts['archived_comment'], 1)
+        restored = ArchivedPost.objects.get(id=self.post.id)
+        self.assertEqual(restored.pub_date, self.pub_date)
+        self.assertEqual(restored.archived, archived.archived)
+        self.assertEqual(restored.group, self.group)
+        self.assertEqual(
+            ArchivedComment.objects.get(post=restored).author, self.reader
+        )
+
+    def test_user_export_includes_archived_rows(self):
+        archive_posts(cutoff=timezone.now() - timedelta(days=1))
+        self.assertEqual(
+            [
+                json.loads(line)['model']
+                for line in export_lines(user=self.author)
+            ],
+            ['group', 'archived_post'],
+        )
+        self.assertEqual(
+            [
+                json.loads(line)['model']
+                for line in export_lines(user=self.reader)
+            ],
+            ['archived_comment', 'follow'],
+        )
+
+    def test_import_is_repeatable(self):
+        lines = list(export_lines())
+        import_lines(lines)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_import_keeps_dates_of_existing_rows(self):
+        lines = list(export_lines())
+        live_date = timezone.now() - timedelta(days=1)
+        Post.objects.filter(id=self.post.id).update(pub_date=live_date)
+        import_lines(lines)
+        self.assertEqual(
+            Post.objects.get(id=self.post.id).pub_date, live_date
+        )
+
+    def test_user_export_holds_only_own_rows(self):
+        models = [
+            json.loads(line)['model']
+            for line in export_lines(user=self.reader)
+        ]
+        self.assertEqual(models, ['comment', 'follow'])
+
+    def test_download_view_streams_user_data(self):
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(reverse('posts:export_my_data'))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('Старый пост', body)
+        self.assertNotIn('Комментарий', body)
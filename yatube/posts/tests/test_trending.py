@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import trending
+from ..models import Comment, Follow, Post, PostScore
+
+User = get_user_model()
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='popular')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.quiet = Post.objects.create(author=cls.reader, text='Тихий')
+        cls.hot = Post.objects.create(author=cls.author, text='Горячий')
+        cls.old = Post.objects.create(author=cls.author, text='Старый')
+        Post.objects.filter(id=cls.old.id).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        for number in range(3):
+            Comment.objects.create(
+                post=cls.hot, author=cls.reader, text=f'Ответ {number}'
+            )
+
+    def test_rank_prefers_comments_reach_and_freshness(self):
+        now = timezone.now().timestamp()
+        self.assertGreater(trending.rank(5, 0, now), trending.rank(0, 0, now))
+        self.assertGreater(
+            trending.rank(0, 100, now), trending.rank(0, 0, now)
+        )
+        self.assertGreater(
+            trending.rank(0, 0, now), trending.rank(0, 0, now - 3600)
+        )
+
+    def test_recompute_scores_recent_posts_in_batches(self):
+        self.assertEqual(trending.recompute(batch_size=1), 2)
+        ranked = list(
+            PostScore.objects.order_by('-score').values_list(
+                'post_id', flat=True
+            )
+        )
+        self.assertEqual(ranked, [self.hot.id, self.quiet.id])
+
+    def test_new_comment_updates_score_incrementally(self):
+        trending.recompute()
+        before = PostScore.objects.get(post=self.quiet).score
+        Comment.objects.create(
+            post=self.quiet, author=self.author, text='Первый ответ'
+        )
+        self.assertGreater(trending.score_post(self.quiet.id), before)
+        self.assertIsNone(trending.score_post(self.old.id))
+
+    def test_batch_and_incremental_scores_agree(self):
+        trending.recompute()
+        batch = PostScore.objects.get(post=self.hot).score
+        self.assertAlmostEqual(trending.score_post(self.hot.id), batch)
+
+    def test_trending_feed_pages_by_cursor(self):
+        trending.recompute()
+        client = Client()
+        with self.settings(TRENDING_PAGE_SIZE=1):
+            response = client.get(reverse('posts:trending'))
+            self.assertEqual(
+                [post.id for post in response.context['posts']],
+                [self.hot.id],
+            )
+            response = client.get(
+                reverse('posts:trending'),
+                {'after': response.context['next_cursor']},
+            )
+        self.assertEqual(
+            [post.id for post in response.context['posts']], [self.quiet.id]
+        )
+        self.assertIsNone(response.context['next_cursor'])
+        bad = client.get(reverse('posts:trending'), {'after': '!'})
+        self.assertEqual(bad.status_code, 400)
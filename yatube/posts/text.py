@@ -0,0 +1,16 @@
+"""Подготовка текста поста: выдержка для лент и готовый HTML."""
+from django.conf import settings
+from django.template.defaultfilters import truncatechars
+from django.utils.html import linebreaks, urlize
+
+
+def make_excerpt(text):
+    return truncatechars(text, settings.POST_EXCERPT_LENGTH)
+
+
+def render_html(text):
+    """Экранирует текст, расставляет абзацы и, по настройке, ссылки."""
+    if settings.POST_LINKIFY:
+        html = urlize(text, nofollow=True, autoescape=True)
+        return linebreaks(html)
+    return linebreaks(text, autoescape=True)
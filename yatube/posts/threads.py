@@ -0,0 +1,96 @@
+"""Ветки комментариев в виде материализованного пути.
+
+У каждого комментария path — цепочка id предков и его собственного,
+дополненных нулями до одной ширины: '0000000012/0000000045/'. Сортировка
+по path даёт обход дерева в глубину, ответы идут по порядку создания, а
+всё поддерево комментария — диапазон [path, path + '~') в индексе
+(post, path): символ '~' больше любой цифры и '/'.
+
+Первые COMMENT_THREADS веток поста вместе со всеми ответами читаются
+одним запросом: верхняя граница диапазона — path первой не вошедшей
+корневой записи, её достаёт подзапрос.
+"""
+from django.conf import settings
+from django.db.models import F, Subquery, Value
+from django.db.models.functions import Coalesce
+
+WIDTH = 10
+END = '~'
+
+
+def segment(pk):
+    return f'{pk:0{WIDTH}d}/'
+
+
+def child_path(parent, pk):
+    """Путь нового комментария; глубже COMMENT_MAX_DEPTH ответы не
+    вкладываются и становятся соседями родителя."""
+    if parent is None:
+        return segment(pk)
+    base = parent.path
+    if parent.depth >= settings.COMMENT_MAX_DEPTH:
+        base = base[:-len(segment(0))]
+    return base + segment(pk)
+
+
+def subtree(queryset, path):
+    """Комментарий с path и все ответы на него, в порядке обхода."""
+    return queryset.filter(
+        path__gte=path, path__lt=path + END
+    ).order_by('path')
+
+
+def top_threads(queryset, limit=None, after=None):
+    """Первые limit веток с ответами одним диапазонным запросом.
+
+    after — id корня, после ветки которого продолжить. Возвращает
+    список комментариев в порядке обхода и id корня для следующей
+    страницы (None, если веток больше нет).
+    """
+    limit = limit or settings.COMMENT_THREADS
+    if after is not None:
+        queryset = queryset.filter(path__gte=segment(after) + END)
+    # Строки без пути (вставленные в обход save) в границу не попадают
+    # и выводятся на первой странице.
+    bound = (
+        queryset.filter(depth=0).exclude(path='').order_by('path')
+        .values('path')[limit:limit + 1]
+    )
+    comments = list(
+        queryset.annotate(next_root=Subquery(bound)).filter(
+            path__lt=Coalesce(F('next_root'), Value(END))
+        ).order_by('path')
+    )
+    # Следующая страница есть, только если подзапрос нашёл корень за
+    # пределами limit.
+    more = bool(comments) and comments[0].next_root is not None
+    roots = [comment for comment in comments if comment.depth == 0]
+    fold(comments)
+    return comments, roots[-1].id if more and roots else None
+
+
+def fold(comments, shown=None):
+    """Размечает ответы для свёрнутого вывода без запросов к БД.
+
+    В каждой ветке первые shown ответов видны сразу, остальные уходят
+    под спойлер: у первого скрытого fold_start — число скрытых, у
+    последнего fold_end=True.
+    """
+    shown = settings.COMMENT_REPLIES_SHOWN if shown is None else shown
+    thread = []
+
+    def close():
+        hidden = thread[shown:]
+        if hidden:
+            hidden[0].fold_start = len(hidden)
+            hidden[-1].fold_end = True
+
+    for comment in comments:
+        comment.fold_start, comment.fold_end = 0, False
+        if comment.depth == 0:
+            close()
+            thread = []
+        else:
+            thread.append(comment)
+    close()
+    return comments
@@ -0,0 +1,153 @@
+"""Потоковые выгрузка и загрузка контента в формате NDJSON.
+
+Одна строка — одна запись: {"model": "post", "fields": {...}}. Записи идут
+в порядке зависимостей (группы, посты, комментарии, архивные посты и их
+комментарии, подписки), так что загрузка проходит файл один раз.
+Пользователи не выгружаются: при загрузке они должны уже существовать с
+теми же id.
+"""
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+
+from . import graph, tags
+from .archive import bulk_restore
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Group, Post
+)
+
+# Модель, поля выгрузки и поля дат, которые нужно сохранить при загрузке.
+MODELS = {
+    'group': (Group, ('id', 'title', 'slug', 'description'), []),
+    'post': (
+        Post,
+        (
+            'id', 'text', 'excerpt', 'text_html', 'pub_date', 'updated_at',
+            'author_id', 'group_id', 'image', 'views',
+        ),
+        ['pub_date', 'updated_at'],
+    ),
+    'comment': (
+        Comment,
+        (
+            'id', 'post_id', 'author_id', 'text', 'created', 'parent_id',
+            'path', 'depth',
+        ),
+        ['created'],
+    ),
+    'archived_post': (
+        ArchivedPost,
+        (
+            'id', 'text', 'excerpt', 'text_html', 'pub_date', 'updated_at',
+            'author_id', 'group_id', 'image', 'views', 'archived',
+        ),
+        ['updated_at', 'archived'],
+    ),
+    'archived_comment': (
+        ArchivedComment,
+        (
+            'id', 'post_id', 'author_id', 'text', 'created', 'parent_id',
+            'path', 'depth',
+        ),
+        [],
+    ),
+    'follow': (Follow, ('id', 'user_id', 'author_id'), []),
+}
+
+
+class _Encoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder обрезает время до миллисекунд, а даты
+    # при переносе должны совпасть точно.
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _querysets(user=None):
+    if user is None:
+        return {
+            'group': Group.objects.all(),
+            'post': Post.objects.all(),
+            'comment': Comment.objects.all(),
+            'archived_post': ArchivedPost.objects.all(),
+            'archived_comment': ArchivedComment.objects.all(),
+            'follow': Follow.objects.all(),
+        }
+    return {
+        'group': Group.objects.filter(
+            Q(posts__author=user) | Q(archived_posts__author=user)
+        ).distinct(),
+        'post': Post.objects.filter(author=user),
+        'comment': Comment.objects.filter(author=user),
+        'archived_post': ArchivedPost.objects.filter(author=user),
+        'archived_comment': ArchivedComment.objects.filter(author=user),
+        'follow': Follow.objects.filter(user=user),
+    }
+
+
+def export_lines(user=None, chunk_size=None):
+    """Генератор строк NDJSON; в памяти не больше chunk_size записей.
+
+    Без user выгружается весь контент, с user — только его данные.
+    """
+    if chunk_size is None:
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+    querysets = _querysets(user)
+    for name, (model, fields, _) in MODELS.items():
+        rows = querysets[name].order_by('id').values(*fields)
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield json.dumps(
+                {'model': name, 'fields': row},
+                cls=_Encoder,
+                ensure_ascii=False,
+            ) + '\n'
+
+
+@transaction.atomic
+def _flush(name, rows):
+    model, _, date_fields = MODELS[name]
+    instances = [model(**fields) for fields in rows]
+    if date_fields:
+        bulk_restore(model, instances, date_fields, ignore_conflicts=True)
+    else:
+        model.objects.bulk_create(instances, ignore_conflicts=True)
+    if model is Follow:
+        # bulk_create минует Follow.save, поэтому граф сбрасываем сами.
+        graph.forget(
+            (follow.user_id, follow.author_id) for follow in instances
+        )
+    if model is Post:
+        tags.index_posts(instances)
+
+
+def import_lines(lines, batch_size=None):
+    """Загружает строки NDJSON пачками по batch_size через bulk_create.
+
+    Записи с уже занятыми id не вставляются повторно, поэтому загрузку
+    того же файла можно повторить. Возвращает словарь
+    {модель: число прочитанных записей}.
+    """
+    if batch_size is None:
+        batch_size = settings.IMPORT_BATCH_SIZE
+    counts = dict.fromkeys(MODELS, 0)
+    name, batch = None, []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if record['model'] not in MODELS:
+            raise ValueError(f'Неизвестная модель: {record["model"]}')
+        if batch and (record['model'] != name or len(batch) >= batch_size):
+            _flush(name, batch)
+            batch = []
+        name = record['model']
+        batch.append(record['fields'])
+        counts[name] += 1
+    if batch:
+        _flush(name, batch)
+    return counts
@@ -0,0 +1,206 @@
+"""Рейтинг популярных постов: скорость комментариев, охват автора и возраст.
+
+Затухание со временем записано в логарифмической форме:
+
+    rank = ln(1 + a * комментарии_за_окно + b * ln(1 + читатели))
+           + ln 2 * (pub_date - EPOCH) / период_полураспада
+
+Порядок по rank совпадает с порядком по «весу × 0.5 ** (возраст /
+период)», но rank не зависит от момента расчёта. Поэтому пересчитанный
+пачкой и обновлённый после нового комментария рейтинги сравнимы между
+собой, а лента не требует пересчёта на каждый запрос.
+
+Пакетный пересчёт идёт по свежим постам кусками по id и считает рейтинг
+векторно в NumPy; число читателей берётся из плотного массива по id автора.
+"""
+import base64
+import binascii
+from datetime import timedelta
+from math import log
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import graph
+
+EPOCH = 1_600_000_000
+
+
+class CursorError(ValueError):
+    pass
+
+
+def rank(comments, followers, published):
+    """Рейтинг для скаляров или массивов NumPy одной формы.
+
+    published — время публикации в секундах Unix.
+    """
+    weight = (
+        1
+        + settings.TRENDING_COMMENT_WEIGHT * np.asarray(comments)
+        + settings.TRENDING_REACH_WEIGHT * np.log1p(followers)
+    )
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    return np.log(weight) + log(2) * (np.asarray(published) - EPOCH) / (
+        half_life
+    )
+
+
+def _horizon(now):
+    return now - timedelta(days=settings.TRENDING_HORIZON_DAYS)
+
+
+def _window(now):
+    return now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+
+
+def _followers_by_author():
+    from .models import Follow
+
+    rows = list(
+        Follow.objects.values('author_id').annotate(total=Count('id'))
+        .order_by().values_list('author_id', 'total')
+    )
+    if not rows:
+        return np.zeros(1)
+    pairs = np.array(rows, dtype=np.int64)
+    dense = np.zeros(pairs[:, 0].max() + 1)
+    dense[pairs[:, 0]] = pairs[:, 1]
+    return dense
+
+
+def _score_batch(rows, first_id, last_id, followers, window):
+    from .models import Comment
+
+    ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+    authors = np.fromiter((row[1] for row in rows), np.int64, len(rows))
+    published = np.fromiter(
+        (row[2].timestamp() for row in rows), np.float64, len(rows)
+    )
+    counts = np.zeros(last_id - first_id + 1)
+    recent = (
+        Comment.objects.filter(
+            post_id__gte=first_id, post_id__lte=last_id, created__gte=window
+        )
+        .values('post_id').annotate(total=Count('id'))
+        .order_by().values_list('post_id', 'total')
+    )
+    for post_id, total in recent:
+        counts[post_id - first_id] = total
+    known = authors < len(followers)
+    reach = np.zeros(len(rows))
+    reach[known] = followers[authors[known]]
+    return ids, rank(counts[ids - first_id], reach, published)
+
+
+def _insert_scores(ids, ranks, now):
+    # bulk_create тратит большую часть времени пересчёта на экземпляры
+    # моделей и подготовку значений; executemany пишет те же строки
+    # из готовых чисел.
+    from .models import PostScore
+
+    computed = connection.ops.adapt_datetimefield_value(now)
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {quote(PostScore._meta.db_table)} '
+            f'({quote("post_id")}, {quote("score")}, {quote("computed")}) '
+            'VALUES (%s, %s, %s)',
+            [(post_id, score, computed) for post_id, score in zip(ids, ranks)],
+        )
+
+
+def recompute(batch_size=None, now=None):
+    """Пересчитывает рейтинги свежих постов пачками; возвращает их число.
+
+    Каждая пачка заменяется в PostScore своей транзакцией, посты старше
+    TRENDING_HORIZON_DAYS из рейтинга удаляются.
+    """
+    from .models import Post, PostScore
+
+    batch_size = batch_size or settings.TRENDING_BATCH_SIZE
+    now = now or timezone.now()
+    horizon, window = _horizon(now), _window(now)
+    PostScore.objects.filter(post__pub_date__lt=horizon).delete()
+    followers = _followers_by_author()
+    last_id = 0
+    scored = 0
+    while True:
+        rows = list(
+            Post.objects.filter(id__gt=last_id, pub_date__gte=horizon)
+            .order_by('id')
+            .values_list('id', 'author_id', 'pub_date')[:batch_size]
+        )
+        if not rows:
+            return scored
+        first_id, last_id = rows[0][0], rows[-1][0]
+        ids, ranks = _score_batch(rows, first_id, last_id, followers, window)
+        with transaction.atomic():
+            PostScore.objects.filter(
+                post_id__gte=first_id, post_id__lte=last_id
+            ).delete()
+            _insert_scores(ids.tolist(), ranks.tolist(), now)
+        scored += len(rows)
+
+
+def score_post(post_id):
+    """Обновляет рейтинг одного поста, например после нового комментария."""
+    from .models import Post, PostScore
+
+    now = timezone.now()
+    post = Post.objects.filter(
+        id=post_id, pub_date__gte=_horizon(now)
+    ).only('author_id', 'pub_date').first()
+    if post is None:
+        return None
+    comments = post.comments.filter(created__gte=_window(now)).count()
+    score = float(rank(
+        comments,
+        len(graph.followers(post.author_id)),
+        post.pub_date.timestamp(),
+    ))
+    PostScore.objects.update_or_create(
+        post_id=post_id, defaults={'score': score}
+    )
+    return score
+
+
+def encode_cursor(score, post_id):
+    raw = f'{score!r}|{post_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        score, post_id = base64.urlsafe_b64decode(
+            cursor.encode()
+        ).decode().split('|')
+        return float(score), int(post_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise CursorError(cursor)
+
+
+def trending_page(posts, cursor=None, size=None):
+    """Страница ленты популярного после курсора и курсор следующей.
+
+    posts — queryset постов; в ленту попадают только посты с рейтингом.
+    """
+    size = size or settings.TRENDING_PAGE_SIZE
+    posts = posts.filter(score__isnull=False).annotate(
+        rank=F('score__score')
+    )
+    if cursor:
+        score, post_id = decode_cursor(cursor)
+        posts = posts.filter(
+            Q(score__score__lt=score)
+            | Q(score__score=score, id__lt=post_id)
+        )
+    page = list(posts.order_by('-score__score', '-id')[:size + 1])
+    next_cursor = None
+    if len(page) > size:
+        page = page[:size]
+        next_cursor = encode_cursor(page[-1].rank, page[-1].id)
+    return page, next_cursor
@@ -6,6 +6,9 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
+    path('tag/<str:name>/rss/', views.tag_rss, name='tag_rss'),
+    path('tag/<str:name>/atom/', views.tag_atom, name='tag_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
@@ -15,7 +18,23 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/react/',
+        views.post_react,
+        name='post_react'
+    ),
+    path(
+        'comments/<int:comment_id>/react/',
+        views.comment_react,
+        name='comment_react'
+    ),
+    path(
+        'notifications/',
+        views.notification_inbox,
+        name='notifications'
+    ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('trending/', views.trending_index, name='trending'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -26,4 +45,41 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path(
+        'profile/<str:username>/follow/json/',
+        views.profile_follow_json,
+        name='profile_follow_json'
+    ),
+    path(
+        'profile/<str:username>/unfollow/json/',
+        views.profile_unfollow_json,
+        name='profile_unfollow_json'
+    ),
+    path('new/', views.new_posts, name='new_posts'),
+    path(
+        'stats/cards/',
+        views.card_cache_stats,
+        name='card_cache_stats'
+    ),
+    path('export/', views.export_my_data, name='export_my_data'),
+    path('rss/', views.posts_rss, name='posts_rss'),
+    path('atom/', views.posts_atom, name='posts_atom'),
+    path('group/<slug:slug>/rss/', views.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', views.group_atom, name='group_atom'),
+    path(
+        'profile/<str:username>/rss/',
+        views.profile_rss,
+        name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        views.profile_atom,
+        name='profile_atom'
+    ),
+    path('sitemap.xml', views.sitemap_index, name='sitemap_index'),
+    path(
+        'sitemap-<slug:section>-<int:segment>.xml',
+        views.sitemap_segment,
+        name='sitemap_segment'
+    ),
 ]
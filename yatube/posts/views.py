@@ -1,12 +1,34 @@
+import json
+import math
+import time
+
 from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404
-from .models import Post, Group, Follow
+from .models import ArchivedPost, Comment, Post, Group, Tag
+from .archive import HotColdPosts
+from .queries import feed_queryset
+from .merge_feed import MergeFeed
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.template.defaultfilters import truncatechars
 from .forms import PostForm, CommentForm
 from django.shortcuts import redirect
 from django.views.decorators.cache import cache_page
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import is_safe_url
+from django.conf import settings
+from django.views.decorators.http import require_POST
+from . import (
+    cards, counters, follows, graph, live, notifications, reactions,
+    recommend, syndication, tags, tasks, threads, transfer, trending,
+)
+from core import jobs
 
 
 User = get_user_model()
@@ -16,10 +38,12 @@ posts_on_page: int = 10
 @cache_page(20, key_prefix='index_page')
 def index(request):
     template = 'posts/index.html'
-    posts = Post.objects.select_related('author')
+    posts = feed_queryset(Post.objects.visible())
     paginator = Paginator(posts, posts_on_page)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = reactions.attach_page(
+        paginator.get_page(page_number), request.user
+    )
     context = {
         'page_obj': page_obj,
         'posts': posts,
@@ -30,10 +54,12 @@ def index(request):
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author')
+    posts = feed_queryset(group.posts.visible())
     paginator = Paginator(posts, posts_on_page)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = reactions.attach_page(
+        paginator.get_page(page_number), request.user
+    )
     context = {
         'page_obj': page_obj,
         'group': group,
@@ -42,39 +68,77 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    posts = feed_queryset(tags.tag_posts(tag))
+    paginator = Paginator(posts, posts_on_page)
+    page_number = request.GET.get('page')
+    page_obj = reactions.attach_page(
+        paginator.get_page(page_number), request.user
+    )
+    context = {
+        'page_obj': page_obj,
+        'tag': tag,
+    }
+    return render(request, 'posts/tag.html', context)
+
+
 def profile(request, username):
     title = f'Профиль пользователя {username}'
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('author')
+    author = get_object_or_404(User, username=username, is_active=True)
+    posts = HotColdPosts(
+        feed_queryset(author.posts.all()),
+        feed_queryset(author.archived_posts.all()),
+    )
     paginator = Paginator(posts, posts_on_page)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = reactions.attach_page(
+        paginator.get_page(page_number), request.user
+    )
     following = False
+    suggestions = []
     if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
+        following = graph.is_following(request.user.id, author.id)
+        suggestions = recommend.suggestions(request.user)
     context = {
         'author': author,
         'page_obj': page_obj,
         'title': title,
         'posts': posts,
         'following': following,
+        'suggestions': suggestions,
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = Post.objects.visible().filter(id=post_id).first()
+    archived = post is None
+    if archived:
+        post = get_object_or_404(
+            ArchivedPost, id=post_id, author__is_active=True
+        )
+    else:
+        counters.record_view(post.id)
+    after = request.GET.get('after')
+    if after is not None and not after.isdigit():
+        return HttpResponseBadRequest('after')
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
-    title = f'Пост: {truncatechars(post.text, 30)}'
+    comments, next_thread = threads.top_threads(
+        post.comments.filter(author__is_active=True).select_related('author'),
+        after=after and int(after),
+    )
+    reactions.attach(comments, request.user)
+    reactions.attach([post], request.user)
+    title = f'Пост: {truncatechars(post.excerpt, 30)}'
     context = {
         'title': title,
         'post': post,
+        'archived': archived,
         'form': form,
         'comments': comments,
+        'next_thread': next_thread,
+        'tags': [] if archived else Tag.objects.filter(post_links__post=post),
     }
     return render(request, 'posts/post_detail.html', context)
 
@@ -90,6 +154,8 @@ def post_create(request):
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            if post.image:
+                jobs.enqueue(tasks.make_thumbnail, post_id=post.id)
             return redirect('posts:profile', request.user.username)
         return render(request, 'posts/create_post.html', {'form': form})
     form = PostForm()
@@ -108,6 +174,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         post.save()
+        if 'image' in form.changed_data and post.image:
+            jobs.enqueue(tasks.make_thumbnail, post_id=post.id)
         return redirect('posts:post_detail', post_id)
     context = {
         'is_edit': True,
@@ -125,38 +193,257 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        parent = request.POST.get('parent', '')
+        if parent.isdigit():
+            comment.parent = get_object_or_404(Comment, id=parent, post=post)
         comment.save()
+        notifications.after_commit(notifications.commented, comment)
     return redirect('posts:post_detail', post_id=post_id)
 
 
+def trending_index(request):
+    try:
+        posts, next_cursor = trending.trending_page(
+            feed_queryset(Post.objects.visible()), request.GET.get('after')
+        )
+    except trending.CursorError:
+        return HttpResponseBadRequest('Неверный курсор')
+    context = {
+        'posts': reactions.attach(posts, request.user),
+        'next_cursor': next_cursor,
+        'trending': True,
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+def followed_posts(user):
+    """Посты авторов из графа подписок, без JOIN по posts_follow."""
+    author_ids = graph.followings(user.id)
+    if len(author_ids) > settings.FOLLOW_GRAPH_IN_LIMIT:
+        return Post.objects.visible().filter(author__following__user=user)
+    return Post.objects.visible().filter(author_id__in=list(author_ids))
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(
-        author__following__user=request.user
-    )
+    if settings.FOLLOW_FEED_ENGINE == 'merge':
+        posts = MergeFeed(request.user)
+    else:
+        posts = feed_queryset(followed_posts(request.user))
     paginator = Paginator(posts, posts_on_page)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = reactions.attach_page(
+        paginator.get_page(page_number), request.user
+    )
     context = {
         'page_obj': page_obj,
+        'suggestions': recommend.suggestions(request.user),
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def notification_inbox(request):
+    before = request.GET.get('before')
+    if before is not None and not before.isdigit():
+        return HttpResponseBadRequest('before')
+    rows, next_cursor = notifications.inbox_page(
+        request.user, before and int(before)
+    )
+    if before is None:
+        notifications.mark_read(request.user)
+    context = {
+        'notifications': rows,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/notifications.html', context)
+
+
 @login_required
 def profile_follow(request, username):
-    user = request.user
-    author = User.objects.get(username=username)
-    follower = Follow.objects.filter(user=user, author=author)
-    if user != author and not follower.exists():
-        Follow.objects.create(user=user, author=author)
+    author = get_object_or_404(User, username=username)
+    follows.follow(request.user, author)
     return redirect('posts:profile', username=author)
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    follower = Follow.objects.filter(user=request.user, author=author)
-    if follower.exists():
-        follower.delete()
+    follows.unfollow(request.user, author)
     return redirect('posts:profile', username=author)
+
+
+@login_required
+@require_POST
+def profile_follow_json(request, username):
+    author = get_object_or_404(User, username=username)
+    follows.follow(request.user, author)
+    following = request.user != author
+    return JsonResponse(follows.follow_state(request.user, author, following))
+
+
+@login_required
+@require_POST
+def profile_unfollow_json(request, username):
+    author = get_object_or_404(User, username=username)
+    follows.unfollow(request.user, author)
+    return JsonResponse(follows.follow_state(request.user, author, False))
+
+
+def _react(request, target, post_id):
+    """Ставит реакцию kind из POST или снимает её при пустом kind."""
+    kind = request.POST.get('kind')
+    if kind and kind not in reactions.KINDS:
+        return HttpResponseBadRequest('kind')
+    if kind:
+        reactions.react(request.user, target, kind)
+    else:
+        reactions.unreact(request.user, target)
+    if 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        return JsonResponse(reactions.state(request.user, target))
+    back = request.META.get('HTTP_REFERER')
+    if back and is_safe_url(back, allowed_hosts={request.get_host()}):
+        return redirect(back)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def post_react(request, post_id):
+    post = get_object_or_404(Post.objects.visible(), id=post_id)
+    return _react(request, post, post.id)
+
+
+@login_required
+@require_POST
+def comment_react(request, comment_id):
+    comment = get_object_or_404(
+        Comment, id=comment_id, author__is_active=True
+    )
+    return _react(request, comment, comment.post_id)
+
+
+@staff_member_required
+def card_cache_stats(request):
+    return JsonResponse({
+        'hits': cards.stats['hits'],
+        'misses': cards.stats['misses'],
+        'hit_rate': cards.hit_rate(),
+    })
+
+
+def _live_scope(request):
+    """Посты ленты, за обновлениями которой следит клиент."""
+    if request.GET.get('group'):
+        group = get_object_or_404(Group, slug=request.GET['group'])
+        return group.posts.visible()
+    if request.GET.get('follow'):
+        return Post.objects.visible().filter(
+            author__following__user=request.user
+        )
+    return Post.objects.visible()
+
+
+def _live_state(posts, since, latest):
+    has_new = latest is not None and (since is None or latest > since)
+    return {
+        'latest': latest,
+        'new': posts.filter(pub_date__gt=since).count()
+        if has_new and since else 0,
+    }
+
+
+def new_posts(request):
+    """Есть ли в ленте посты новее ?since: long-poll или SSE.
+
+    ?wait — сколько секунд ждать (от 0 до LIVE_MAX_WAIT). С заголовком
+    Accept: text/event-stream отдаётся поток событий до конца ожидания.
+    """
+    if request.GET.get('follow') and not request.user.is_authenticated:
+        return JsonResponse({'error': 'authentication required'}, status=401)
+    since = None
+    if request.GET.get('since'):
+        since = parse_datetime(request.GET['since'])
+        if since is None:
+            return HttpResponseBadRequest('since')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+    try:
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        return HttpResponseBadRequest('wait')
+    # nan и inf не ограничиваются min() и держали бы поток вечно.
+    if not math.isfinite(wait):
+        return HttpResponseBadRequest('wait')
+    wait = min(max(wait, 0), settings.LIVE_MAX_WAIT)
+    posts = _live_scope(request)
+    if 'text/event-stream' in request.META.get('HTTP_ACCEPT', ''):
+        response = StreamingHttpResponse(
+            _live_events(posts, since, wait),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+    latest = live.wait_for_new(posts, since, wait)
+    return JsonResponse(_live_state(posts, since, latest))
+
+
+def _live_events(posts, since, wait):
+    deadline = time.monotonic() + wait
+    yield f'retry: {settings.LIVE_SSE_RETRY_MS}\n\n'
+    while True:
+        remaining = max(deadline - time.monotonic(), 0)
+        latest = live.wait_for_new(posts, since, remaining)
+        if latest is not None and (since is None or latest > since):
+            data = json.dumps(
+                _live_state(posts, since, latest), cls=DjangoJSONEncoder
+            )
+            yield f'event: posts\ndata: {data}\n\n'
+            since = latest
+        if time.monotonic() >= deadline:
+            return
+
+
+@login_required
+def export_my_data(request):
+    response = StreamingHttpResponse(
+        transfer.export_lines(user=request.user),
+        content_type='application/x-ndjson; charset=utf-8',
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="yatube-{request.user.username}.ndjson"'
+    )
+    return response
+
+
+posts_rss = syndication.feed_view(syndication.LatestPostsFeed)
+posts_atom = syndication.feed_view(syndication.LatestPostsAtomFeed)
+group_rss = syndication.feed_view(syndication.GroupPostsFeed)
+group_atom = syndication.feed_view(syndication.GroupPostsAtomFeed)
+tag_rss = syndication.feed_view(syndication.TagPostsFeed)
+tag_atom = syndication.feed_view(syndication.TagPostsAtomFeed)
+profile_rss = syndication.feed_view(syndication.AuthorPostsFeed)
+profile_atom = syndication.feed_view(syndication.AuthorPostsAtomFeed)
+
+
+def sitemap_index(request):
+    marker, latest = syndication.index_marker()
+    return syndication.conditional(
+        request, marker, latest, 'application/xml',
+        lambda: syndication.index_file(marker)[0],
+    )
+
+
+def sitemap_segment(request, section, segment):
+    if section not in syndication.SCOPES:
+        raise Http404
+    row = syndication.segment_row(section, segment)
+    if row is None:
+        raise Http404
+    return syndication.conditional(
+        request,
+        syndication.segment_marker(row),
+        row['latest'],
+        'application/xml',
+        lambda: syndication.segment_file(section, segment, row)[0],
+    )
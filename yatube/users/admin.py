@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import AccountDeletion
+
+
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = (
+        'username', 'requested', 'finished', 'deleted_posts',
+        'deleted_comments', 'deleted_follows', 'deleted_reactions',
+        'deleted_notifications',
+    )
+    search_fields = ('username',)
+    list_filter = ('finished',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(AccountDeletion, AccountDeletionAdmin)
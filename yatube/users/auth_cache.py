@@ -0,0 +1,51 @@
+"""Кэширование пользователя, загружаемого по сессии."""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+
+def user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def get_user(request):
+    """Аналог django.contrib.auth.get_user, читающий пользователя из кэша.
+
+    Хэш сессии сверяется так же, как в Django, поэтому смена пароля
+    разлогинивает остальные сессии даже при закэшированном пользователе,
+    а неактивного пользователя не пускает user_can_authenticate бэкенда.
+    Сохранение пользователя сбрасывает кэш только в своём процессе: в
+    остальных блокировка или удаление аккаунта вступят в силу не позже
+    чем через AUTH_USER_CACHE_TIMEOUT секунд.
+    """
+    try:
+        user_id = request.session[auth.SESSION_KEY]
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+    backend = auth.load_backend(backend_path)
+    can_authenticate = getattr(backend, 'user_can_authenticate', None)
+    if can_authenticate is not None and not can_authenticate(user):
+        cache.delete(key)
+        return AnonymousUser()
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not session_hash or not constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    ):
+        request.session.flush()
+        return AnonymousUser()
+    user.backend = backend_path
+    return user
@@ -0,0 +1,142 @@
+"""Удаление аккаунта: мгновенное скрытие и фоновая очистка чанками.
+
+Каскад User → Post/Comment/Follow в одном запросе грузит в память все
+связанные объекты. Вместо этого аккаунт сразу деактивируется (его посты
+и комментарии пропадают из лент через Post.objects.visible()), а данные
+удаляет фоновая задача users.tasks.purge_account (или команда
+purge_accounts) пачками через core.batch.Backfill: уведомления, реакции,
+подписки, комментарии, посты с картинками и только потом сам
+пользователь.
+"""
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.batch import Backfill
+from posts import graph, notifications, reactions
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Notification, Post,
+    Reaction,
+)
+
+from .models import AccountDeletion
+
+
+@transaction.atomic
+def request_deletion(user):
+    """Деактивирует аккаунт и ставит его данные в очередь на удаление."""
+    user.is_active = False
+    user.save(update_fields=['is_active'])
+    deletion, _ = AccountDeletion.objects.get_or_create(
+        user=user, defaults={'username': user.username}
+    )
+    return deletion
+
+
+def _delete_notifications(objects):
+    Notification.objects.filter(id__in=[obj.id for obj in objects]).delete()
+    notifications.forget({obj.recipient_id for obj in objects})
+    return 'deleted_notifications'
+
+
+def _delete_reactions(objects):
+    reactions.delete_reactions(objects)
+    return 'deleted_reactions'
+
+
+def _delete_follows(follows):
+    Follow.objects.filter(id__in=[follow.id for follow in follows]).delete()
+    # Массовое удаление минует Follow.delete, граф сбрасываем сами.
+    graph.forget((follow.user_id, follow.author_id) for follow in follows)
+    return 'deleted_follows'
+
+
+def _delete_comments(comments):
+    model = type(comments[0])
+    ids = [comment.id for comment in comments]
+    model.objects.filter(id__in=ids).delete()
+    reactions.drop_counters('comment', ids)
+    return 'deleted_comments'
+
+
+def _delete_posts(posts):
+    model = type(posts[0])
+    images = [post.image for post in posts if post.image]
+    ids = [post.id for post in posts]
+    model.objects.filter(id__in=ids).delete()
+    reactions.drop_counters('post', ids)
+    transaction.on_commit(
+        lambda: [image.storage.delete(image.name) for image in images]
+    )
+    return 'deleted_posts'
+
+
+def _stages(user_id):
+    """Что удалять и в каком порядке: зависимые строки раньше постов."""
+    return (
+        ('notifications', Notification.objects.filter(
+            Q(recipient_id=user_id) | Q(actor_id=user_id)
+        ).only('id', 'recipient_id'), _delete_notifications),
+        ('reactions', Reaction.objects.filter(user_id=user_id).only(
+            'id', 'post_id', 'comment_id', 'kind'
+        ), _delete_reactions),
+        ('follows', Follow.objects.filter(
+            Q(user_id=user_id) | Q(author_id=user_id)
+        ), _delete_follows),
+        ('comments', Comment.objects.filter(
+            Q(author_id=user_id) | Q(post__author_id=user_id)
+        ), _delete_comments),
+        ('archived_comments', ArchivedComment.objects.filter(
+            Q(author_id=user_id) | Q(post__author_id=user_id)
+        ), _delete_comments),
+        ('posts', Post.objects.filter(author_id=user_id).only(
+            'id', 'image'
+        ), _delete_posts),
+        ('archived_posts', ArchivedPost.objects.filter(
+            author_id=user_id
+        ).only('id', 'image'), _delete_posts),
+    )
+
+
+def purge_account(deletion, chunk_size=None, pause=None, progress=None):
+    """Удаляет данные аккаунта чанками; после падения продолжает с места.
+
+    Каждый чанк — отдельная транзакция вместе со счётчиком в deletion.
+    """
+    user_id = deletion.user_id
+    for stage, queryset, delete in _stages(user_id):
+        def process(objects, delete=delete):
+            counter = delete(objects)
+            AccountDeletion.objects.filter(id=deletion.id).update(
+                **{counter: F(counter) + len(objects)}
+            )
+
+        backfill = Backfill(
+            f'account_deletion:{deletion.id}:{stage}',
+            queryset,
+            process,
+            chunk_size=chunk_size,
+            pause=pause,
+            progress=progress,
+        )
+        backfill.run()
+        backfill.reset()
+    with transaction.atomic():
+        if user_id is not None:
+            deletion.user.delete()
+        AccountDeletion.objects.filter(id=deletion.id).update(
+            finished=timezone.now()
+        )
+    deletion.refresh_from_db()
+    return deletion
+
+
+def purge_pending(chunk_size=None, pause=None, progress=None):
+    """Доводит до конца все незавершённые удаления; возвращает их число."""
+    pending = list(
+        AccountDeletion.objects.filter(finished__isnull=True)
+        .select_related('user')
+    )
+    for deletion in pending:
+        purge_account(deletion, chunk_size, pause, progress)
+    return len(pending)
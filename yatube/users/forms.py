@@ -1,5 +1,9 @@
 from django.contrib.auth.forms import UserCreationForm, PasswordResetForm
 from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives
+from django.template import loader
+
+from core.mail import DEDUPE_HEADER
 
 
 User = get_user_model()
@@ -14,3 +18,22 @@ class CreationForm(UserCreationForm):
 class PasswordReset(PasswordResetForm):
     class Meta(PasswordResetForm):
         model = User
+
+    def send_mail(self, subject_template_name, email_template_name, context,
+                  from_email, to_email, html_email_template_name=None):
+        """Как в Django, но повторный сброс на тот же адрес не дублируется."""
+        subject = ''.join(
+            loader.render_to_string(subject_template_name, context)
+            .splitlines()
+        )
+        body = loader.render_to_string(email_template_name, context)
+        message = EmailMultiAlternatives(
+            subject, body, from_email, [to_email],
+            headers={DEDUPE_HEADER: f'password_reset:{to_email.lower()}'},
+        )
+        if html_email_template_name is not None:
+            message.attach_alternative(
+                loader.render_to_string(html_email_template_name, context),
+                'text/html',
+            )
+        message.send()
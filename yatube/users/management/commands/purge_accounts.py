@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.deletion import purge_pending
+
+
+class Command(BaseCommand):
+    help = 'Удаляет данные аккаунтов, ожидающих удаления, пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Количество строк в одной транзакции',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=None,
+            help='Пауза между пачками в секундах',
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Повторять очистку каждые N секунд (фоновый режим)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            purged = purge_pending(
+                chunk_size=options['chunk_size'],
+                pause=options['pause'],
+                progress=lambda state: self.stdout.write(str(state)),
+            )
+            self.stdout.write(f'Удалено аккаунтов: {purged}')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
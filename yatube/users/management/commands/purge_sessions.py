@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.sessions import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Удаляет просроченные сессии пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Повторять очистку каждые N секунд (фоновый режим)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = purge_expired_sessions(options['batch_size'])
+            self.stdout.write(f'Удалено сессий: {deleted}')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
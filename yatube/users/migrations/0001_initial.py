@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, verbose_name='Имя пользователя')),
+                ('requested', models.DateTimeField(auto_now_add=True, verbose_name='Дата заявки')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата завершения')),
+                ('deleted_follows', models.PositiveIntegerField(default=0, verbose_name='Удалено подписок')),
+                ('deleted_comments', models.PositiveIntegerField(default=0, verbose_name='Удалено комментариев')),
+                ('deleted_posts', models.PositiveIntegerField(default=0, verbose_name='Удалено постов')),
+                ('user', models.OneToOneField(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deletion', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Удаление аккаунта',
+                'verbose_name_plural': 'Удаления аккаунтов',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountdeletion',
+            name='deleted_reactions',
+            field=models.PositiveIntegerField(default=0, verbose_name='Удалено реакций'),
+        ),
+    ]
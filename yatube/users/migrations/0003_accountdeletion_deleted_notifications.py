@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_accountdeletion_deleted_reactions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountdeletion',
+            name='deleted_notifications',
+            field=models.PositiveIntegerField(default=0, verbose_name='Удалено уведомлений'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class AccountDeletion(models.Model):
+    """Заявка на удаление аккаунта и ход фоновой очистки его данных."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='deletion',
+    )
+    username = models.CharField('Имя пользователя', max_length=150)
+    requested = models.DateTimeField('Дата заявки', auto_now_add=True)
+    finished = models.DateTimeField('Дата завершения', null=True, blank=True)
+    deleted_follows = models.PositiveIntegerField(
+        'Удалено подписок', default=0
+    )
+    deleted_comments = models.PositiveIntegerField(
+        'Удалено комментариев', default=0
+    )
+    deleted_posts = models.PositiveIntegerField('Удалено постов', default=0)
+    deleted_reactions = models.PositiveIntegerField(
+        'Удалено реакций', default=0
+    )
+    deleted_notifications = models.PositiveIntegerField(
+        'Удалено уведомлений', default=0
+    )
+
+    class Meta:
+        verbose_name = 'Удаление аккаунта'
+        verbose_name_plural = 'Удаления аккаунтов'
+
+    def __str__(self):
+        return self.username
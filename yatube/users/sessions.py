@@ -0,0 +1,21 @@
+"""Пакетная очистка просроченных сессий."""
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+
+def purge_expired_sessions(batch_size=1000):
+    """Удаляет просроченные сессии порциями, не блокируя таблицу надолго.
+
+    Возвращает количество удалённых сессий.
+    """
+    now = timezone.now()
+    deleted = 0
+    while True:
+        keys = list(
+            Session.objects.filter(expire_date__lt=now)
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return deleted
+        Session.objects.filter(session_key__in=keys).delete()
+        deleted += len(keys)
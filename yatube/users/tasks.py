@@ -0,0 +1,13 @@
+"""Фоновые задачи аккаунтов (выполняет manage.py run_workers)."""
+from core.jobs import task
+from .deletion import purge_account as purge
+from .models import AccountDeletion
+
+
+@task
+def purge_account(deletion_id):
+    deletion = AccountDeletion.objects.select_related('user').filter(
+        id=deletion_id, finished__isnull=True
+    ).first()
+    if deletion is not None:
+        purge(deletion)
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import reactions
+from posts.models import Comment, Follow, Post, ReactionCounter
+from .auth_cache import user_cache_key
+from .deletion import purge_pending, request_deletion
+from .models import AccountDeletion
+from .sessions import purge_expired_sessions
+
+User = get_user_model()
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db'
+)
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cached', password='old-password-1'
+        )
+        self.client = Client()
+        self.client.login(username='cached', password='old-password-1')
+
+    def test_authenticated_page_skips_session_and_user_queries(self):
+        """Повторный хит не обращается к django_session и auth_user."""
+        self.client.get(reverse('about:author'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_invalidates_cached_user(self):
+        """Смена пароля сбрасывает кэш и разлогинивает старую сессию."""
+        self.client.get(reverse('about:author'))
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.user.set_password('new-password-2')
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_inactive_cached_user_is_rejected(self):
+        """Неактивный пользователь из кэша не проходит аутентификацию."""
+        self.client.get(reverse('about:author'))
+        key = user_cache_key(self.user.pk)
+        user = cache.get(key)
+        user.is_active = False
+        cache.set(key, user)
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+        self.assertIsNone(cache.get(key))
+
+
+class PurgeSessionsTests(TestCase):
+    def test_purge_removes_only_expired_sessions(self):
+        now = timezone.now()
+        for number in range(5):
+            Session.objects.create(
+                session_key=f'expired{number}',
+                session_data='',
+                expire_date=now - timedelta(days=1),
+            )
+        Session.objects.create(
+            session_key='alive',
+            session_data='',
+            expire_date=now + timedelta(days=1),
+        )
+        self.assertEqual(purge_expired_sessions(batch_size=2), 5)
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive']
+        )
+
+
+@override_settings(BACKFILL_PAUSE=0)
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='leaving')
+        self.other = User.objects.create_user(username='staying')
+        self.posts = [
+            Post.objects.create(author=self.user, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        other_post = Post.objects.create(author=self.other, text='Чужой')
+        Comment.objects.create(
+            post=other_post, author=self.user, text='Мой комментарий'
+        )
+        Comment.objects.create(
+            post=self.posts[0], author=self.other, text='Ответ'
+        )
+        Follow.objects.create(user=self.other, author=self.user)
+
+    def test_request_hides_content_at_once(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse('users:delete_account'))
+        self.assertRedirects(response, reverse('posts:index'))
+        self.assertEqual(list(Post.objects.visible()), [
+            Post.objects.get(author=self.other)
+        ])
+        self.assertEqual(
+            client.get(
+                reverse('posts:profile', args=(self.user.username,))
+            ).status_code,
+            404,
+        )
+        self.assertTrue(Post.objects.filter(author=self.user).exists())
+
+    def test_purge_removes_everything_in_chunks(self):
+        deletion = request_deletion(self.user)
+        states = []
+        self.assertEqual(
+            purge_pending(chunk_size=2, progress=states.append), 1
+        )
+        deletion.refresh_from_db()
+        self.assertIsNotNone(deletion.finished)
+        self.assertIsNone(deletion.user)
+        self.assertEqual(deletion.deleted_posts, 3)
+        self.assertEqual(deletion.deleted_comments, 2)
+        self.assertEqual(deletion.deleted_follows, 1)
+        self.assertFalse(User.objects.filter(username='leaving').exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(purge_pending(), 0)
+        self.assertTrue(AccountDeletion.objects.exists())
+
+    def test_purge_discounts_reactions(self):
+        other_post = Post.objects.get(author=self.other)
+        reactions.react(self.user, other_post, 'like')
+        reactions.react(self.other, other_post, 'like')
+        reactions.react(self.other, self.posts[0], 'heart')
+        request_deletion(self.user)
+        purge_pending()
+        self.assertEqual(AccountDeletion.objects.get().deleted_reactions, 1)
+        self.assertEqual(
+            reactions.counts([reactions.target_key(other_post)]),
+            {reactions.target_key(other_post): {'like': 1}},
+        )
+        self.assertFalse(
+            ReactionCounter.objects.exclude(
+                target=reactions.target_key(other_post)
+            ).exists()
+        )
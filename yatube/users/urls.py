@@ -8,6 +8,7 @@ from django.contrib.auth.views import PasswordResetConfirmView
 from django.contrib.auth.views import PasswordResetCompleteView
 from django.urls import path
 from . import views
+from .forms import PasswordReset
 
 app_name = 'users'
 
@@ -30,7 +31,8 @@ urlpatterns = [
     path(
         'password_reset/',
         PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'
+            template_name='users/password_reset_form.html',
+            form_class=PasswordReset,
         ),
         name='password_reset'
     ),
@@ -69,4 +71,5 @@ urlpatterns = [
         ),
         name='password_change_done'
     ),
+    path('delete/', views.delete_account, name='delete_account'),
 ]
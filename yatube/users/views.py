@@ -1,5 +1,11 @@
+from django.contrib.auth import logout
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
+from core import jobs
+from . import tasks
+from .deletion import request_deletion
 from .forms import CreationForm, PasswordResetForm
 
 
@@ -12,3 +18,13 @@ class SignUp(CreateView):
 class PasswordReset(CreateView):
     form_class = PasswordResetForm
     template_name = 'users/password_reset_form.html'
+
+
+@login_required
+def delete_account(request):
+    if request.method == 'POST':
+        deletion = request_deletion(request.user)
+        jobs.enqueue(tasks.purge_account, deletion_id=deletion.id)
+        logout(request)
+        return redirect('posts:index')
+    return render(request, 'users/delete_account.html')
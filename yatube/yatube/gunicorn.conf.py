@@ -0,0 +1,26 @@
+# Запуск: gunicorn -c yatube/gunicorn.conf.py yatube.wsgi
+# Приложение грузится в мастере, прогревается и только потом форкается,
+# поэтому воркеры получают уже разобранные шаблоны и резолверы.
+import os
+
+os.environ.setdefault('YATUBE_PRODUCTION', '1')
+
+preload_app = True
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+# Long-poll и SSE (posts:new_posts) держат запрос до LIVE_MAX_WAIT секунд;
+# с синхронными воркерами пара таких клиентов занимала бы весь сайт.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 16))
+
+
+def when_ready(server):
+    from django.core.management import call_command
+
+    call_command('warmup')
+
+
+def worker_exit(server, worker):
+    # Просмотры, накопленные воркером после последнего сброса.
+    from posts.counters import buffer
+
+    buffer.flush()
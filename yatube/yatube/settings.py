@@ -22,8 +22,11 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = '-_wml)qb_=3dv466c6#y%+wf2k@1t!n1l!=#anb=e%kup4%=n8'
 
+# Боевой режим: без отладки и с кэширующим загрузчиком шаблонов.
+PRODUCTION = os.getenv('YATUBE_PRODUCTION') == '1'
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not PRODUCTION
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -36,7 +39,12 @@ ALLOWED_HOSTS = [
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # В боевом режиме admin.py приложений импортируются при загрузке
+    # yatube.urls, а не при каждом старте процесса и команды manage.py.
+    (
+        'django.contrib.admin.apps.SimpleAdminConfig' if PRODUCTION
+        else 'django.contrib.admin'
+    ),
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -45,6 +53,7 @@ INSTALLED_APPS = [
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
@@ -53,25 +62,36 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if PRODUCTION:
+    # Шаблоны разбираются один раз на процесс, см. команду warmup
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'posts.context_processors.notifications',
             ],
         },
     },
@@ -138,8 +158,18 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма сначала попадают в очередь core.OutboxEmail, а отправляет их
+# фоновая задача через OUTBOX_EMAIL_BACKEND (см. core.mail)
+EMAIL_BACKEND = 'core.mail.OutboxBackend'
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Писем в одной пачке отправки, приоритет задачи отправки, окно в секундах,
+# в котором повторное письмо с тем же ключом (сброс пароля) отбрасывается,
+# и сколько дней хранить сжатые архивы файлового бэкенда
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_JOB_PRIORITY = 10
+OUTBOX_DEDUPE_WINDOW = 15 * 60
+OUTBOX_FILE_KEEP_DAYS = 14
 
 CACHES = {
     'default': {
@@ -148,3 +178,125 @@ CACHES = {
 }
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Посты старше этого возраста переносятся в архив командой archive_posts
+POSTS_ARCHIVE_AFTER_DAYS = 365
+POSTS_ARCHIVE_BATCH_SIZE = 500
+
+# Длина выдержки поста в лентах и автоссылки в тексте поста
+POST_EXCERPT_LENGTH = 300
+POST_LINKIFY = True
+
+# Время жизни отрисованной карточки поста в кэше
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Граф подписок в кэше. Запросы по спискам авторов бьются на пачки
+# по FOLLOW_GRAPH_IN_LIMIT id, чтобы не упереться в лимит параметров SQLite.
+FOLLOW_GRAPH_TIMEOUT = 60 * 60
+FOLLOW_GRAPH_IN_LIMIT = 500
+
+# Движок ленты подписок: 'graph' — один запрос по id авторов из графа
+# подписок (больше FOLLOW_GRAPH_IN_LIMIT — JOIN по posts_follow),
+# 'merge' — слияние потоков авторов (posts.merge_feed). На SQLite один
+# запрос быстрее при любом числе подписок, см. manage.py bench_follow_feed.
+FOLLOW_FEED_ENGINE = 'graph'
+# Сколько живёт состояние слияния ленты подписок между страницами
+MERGE_FEED_STATE_TIMEOUT = 5 * 60
+
+# Хранение сессий: 'cached_db' — кэш с записью в БД, 'signed_cookies' —
+# подписанные cookie без обращений к БД, 'db' — только БД.
+SESSION_MODE = os.getenv('YATUBE_SESSION_MODE', 'cached_db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_MODE]
+
+# Время жизни пользователя в кэше CachedAuthenticationMiddleware. Кэш у
+# процесса свой, так что блокировка аккаунта доходит до остальных
+# процессов не позже чем через это число секунд
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Ожидание новых постов (posts:new_posts): предел ожидания в секундах,
+# период проверки MAX(pub_date) и пауза переподключения SSE-клиента
+LIVE_MAX_WAIT = 25
+LIVE_POLL_INTERVAL = 5
+LIVE_SSE_RETRY_MS = 3000
+
+# JSON API: размер страницы по умолчанию, максимум и лимит пакета запросов
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+API_MAX_BATCH = 20
+
+# RSS/Atom-ленты и карта сайта (posts.syndication): каталог файлового кэша,
+# число записей в ленте, размер сегмента карты по диапазону id (не больше
+# 50 000 адресов на файл) и адрес сайта для абсолютных ссылок в карте
+FEEDS_CACHE_DIR = os.path.join(BASE_DIR, 'feeds_cache')
+FEED_ITEMS = 50
+SITEMAP_SEGMENT_SIZE = 5000
+SITE_URL = os.getenv('YATUBE_SITE_URL', 'http://localhost:8000')
+
+# Выгрузка и загрузка NDJSON (posts.transfer): сколько строк читать из БД
+# за раз при выгрузке и сколько записей вставлять одним bulk_create
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 1000
+
+# Пакетные проходы core.batch.Backfill: записей в чанке (одна транзакция)
+# и пауза между чанками в секундах
+BACKFILL_CHUNK_SIZE = 1000
+BACKFILL_PAUSE = 0.05
+
+# Фоновая очередь core.jobs: число попыток, базовая пауза перед повтором
+# (удваивается с каждой неудачей), через сколько секунд задача зависшего
+# исполнителя возвращается в очередь, как часто свободный поток её опрашивает
+# и как часто каждый поток ищет такие зависшие задачи
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
+JOB_LOCK_TIMEOUT = 10 * 60
+JOB_POLL_INTERVAL = 1
+JOB_RELEASE_INTERVAL = 60
+
+# Лента популярного (posts.trending): какие посты ранжируются (не старше
+# TRENDING_HORIZON_DAYS), за сколько часов считаются комментарии, период
+# полураспада рейтинга, веса комментариев и охвата автора, размер пачки
+# пересчёта, период фонового пересчёта в секундах и размер страницы
+TRENDING_HORIZON_DAYS = 7
+TRENDING_WINDOW_HOURS = 24
+TRENDING_HALF_LIFE_HOURS = 12
+TRENDING_COMMENT_WEIGHT = 1.0
+TRENDING_REACH_WEIGHT = 0.5
+TRENDING_BATCH_SIZE = 50000
+TRENDING_RECOMPUTE_INTERVAL = 15 * 60
+TRENDING_PAGE_SIZE = 10
+
+# «Кого почитать» (posts.recommend): сколько предложений хранить на
+# пользователя, сколько показывать и сколько пользователей считать за пачку
+# (не больше лимита параметров SQLite в запросе удаления старых строк)
+FOLLOW_SUGGESTIONS_TOP_K = 20
+FOLLOW_SUGGESTIONS_SHOWN = 5
+FOLLOW_SUGGESTIONS_BATCH_SIZE = 500
+
+# Просмотры постов (posts.counters): буфер процесса сбрасывается в БД раз
+# в VIEW_FLUSH_INTERVAL секунд или после VIEW_FLUSH_THRESHOLD просмотров,
+# по VIEW_FLUSH_BATCH_SIZE постов в одном UPDATE ... CASE
+VIEW_FLUSH_INTERVAL = 10
+VIEW_FLUSH_THRESHOLD = 500
+VIEW_FLUSH_BATCH_SIZE = 200
+
+# Реакции (posts.reactions): счётчик каждой пары (цель, вид) разбит на
+# REACTION_COUNTER_SHARDS строк, чтобы одновременные лайки одного поста
+# не упирались в блокировку одной строки
+REACTION_COUNTER_SHARDS = 16
+
+# Ветки комментариев (posts.threads): на странице поста COMMENT_THREADS
+# веток, в каждой сразу видно COMMENT_REPLIES_SHOWN ответов, остальные
+# свёрнуты; ответы глубже COMMENT_MAX_DEPTH не вкладываются
+COMMENT_THREADS = 20
+COMMENT_REPLIES_SHOWN = 3
+COMMENT_MAX_DEPTH = 8
+
+# Уведомления (posts.notifications): счётчик непрочитанных живёт в кэше
+# NOTIFICATION_UNREAD_TIMEOUT секунд — столько он может отставать в других
+# процессах; входящие листаются страницами по NOTIFICATIONS_PAGE_SIZE
+NOTIFICATION_UNREAD_TIMEOUT = 60
+NOTIFICATIONS_PAGE_SIZE = 20